@@ -0,0 +1,428 @@
+"""Load-test and benchmark harness for the portal's hot endpoints.
+
+Seeds a synthetic database at a configurable scale, then measures latency,
+throughput and SQL query counts through the Flask test client and through a
+real HTTP server driven by concurrent clients. Results are written as JSON so
+runs can be compared against each other.
+
+    python -m backend.benchmark --students 10000 --attendance 1000000 --output bench.json
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the lab portal's hot endpoints.")
+    parser.add_argument('--db', help="SQLite file to seed/use (default: a new temporary file)")
+    parser.add_argument('--reuse', action='store_true', help="Skip seeding when --db already holds data")
+    parser.add_argument('--groups', type=int, default=50)
+    parser.add_argument('--subsubgroups-per-group', type=int, default=6)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--slots', type=int, default=300)
+    parser.add_argument('--attendance', type=int, default=1000000)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per test-client scenario")
+    parser.add_argument('--export-requests', type=int, default=3, help="Requests per export scenario")
+    parser.add_argument('--upload-requests', type=int, default=5, help="CSV uploads to time")
+    parser.add_argument('--upload-rows', type=int, default=2000, help="Students per uploaded CSV")
+    parser.add_argument('--http-requests', type=int, default=1000, help="Requests per HTTP scenario")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent HTTP clients")
+    parser.add_argument('--skip-http', action='store_true', help="Only run test-client scenarios")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for data and request mix")
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    # The app reads its configuration at import time, so this must run first
+    if not args.db:
+        fd, args.db = tempfile.mkstemp(prefix='lab_portal_bench_', suffix='.db')
+        os.close(fd)
+        os.remove(args.db)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.db)
+    os.environ.setdefault('FLASK_SECRET_KEY', 'benchmark-secret')
+    os.environ.setdefault('ADMIN_USERNAME', 'admin')
+    os.environ.setdefault('ADMIN_PASSWORD', 'benchmark')
+    # Keep slow-query logging out of the measurements
+    os.environ.setdefault('SLOW_QUERY_MS', '60000')
+    # Every simulated client shares one IP, so the per-IP limit would only measure 429s
+    os.environ.setdefault('PUBLIC_RATE_LIMIT_PER_SECOND', '0')
+
+
+def seed_database(portal, args, rng):
+    db = portal.db
+    started = time.perf_counter()
+    chunk = 10000
+
+    def insert_all(model, rows):
+        for i in range(0, len(rows), chunk):
+            db.session.execute(db.insert(model), rows[i:i + chunk])
+        db.session.commit()
+
+    groups = [{'id': str(uuid.uuid4()), 'name': f"B{i:03d}"} for i in range(args.groups)]
+    insert_all(portal.Group, groups)
+
+    sub_subgroups = []
+    for group in groups:
+        for j in range(args.subsubgroups_per_group):
+            suffix = chr(ord('A') + j) if j < 26 else f"S{j}"
+            sub_subgroups.append({
+                'id': str(uuid.uuid4()), 'key': len(sub_subgroups) + 1,
+                'name': f"{group['name']}-{suffix}", 'group_id': group['id']
+            })
+    insert_all(portal.SubSubgroup, sub_subgroups)
+
+    students = [{
+        'roll_no': str(100000000 + i),
+        'name': f"Student {i}",
+        'sub_subgroup_id': sub_subgroups[i % len(sub_subgroups)]['id']
+    } for i in range(args.students)]
+    insert_all(portal.Student, students)
+
+    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    times = [f"Period {p}" for p in range(1, 10)]
+    slots = []
+    links = []
+    sessions = []
+    ssg_ids_by_group = {}
+    for ssg in sub_subgroups:
+        ssg_ids_by_group.setdefault(ssg['group_id'], []).append(ssg)
+    for i in range(args.slots):
+        group = groups[i % len(groups)]
+        slot = {
+            'id': str(uuid.uuid4()),
+            'key': i + 1,
+            'course': f"UCS{100 + i % 40}",
+            'lab': f"LAB{i // (len(days) * len(times))}",
+            'day': days[i % len(days)],
+            'time': times[(i // len(days)) % len(times)],
+            'group_name': json.dumps([group['name']])
+        }
+        slots.append(slot)
+        group_ssgs = ssg_ids_by_group[group['id']]
+        for ssg in rng.sample(group_ssgs, min(3, len(group_ssgs))):
+            links.append({'lab_slot_id': slot['id'], 'sub_subgroup_id': ssg['id']})
+            sessions.append((slot['key'], ssg['key'], ssg['id']))
+    insert_all(portal.LabSlot, slots)
+    insert_all(portal.SlotSubSubgroup, links)
+    # Inserted without the ORM, so the key counters are moved past the keys used above
+    portal.assign_reference_keys()
+
+    students_by_ssg = {}
+    for student in students:
+        students_by_ssg.setdefault(student['sub_subgroup_id'], []).append(student['roll_no'])
+
+    # One mark per student per linked slot per week until the target row count is reached
+    remaining = args.attendance
+    term_start = datetime.date(2024, 1, 1)
+    week = 0
+    batch = []
+    marked_at = datetime.datetime(2024, 1, 1, 9, 0).isoformat()
+    while remaining > 0 and sessions and students:
+        date = (term_start + datetime.timedelta(weeks=week)).isoformat()
+        for slot_key, ssg_key, ssg_id in sessions:
+            for roll_no in students_by_ssg.get(ssg_id, []):
+                batch.append({
+                    'roll_no': roll_no,
+                    'lab_slot_key': slot_key,
+                    'sub_subgroup_key': ssg_key,
+                    'date': date,
+                    'status': 'Present' if rng.random() < 0.8 else 'Absent',
+                    'marked_by': 'admin',
+                    'marked_at': marked_at
+                })
+                remaining -= 1
+                if len(batch) >= chunk:
+                    db.session.execute(db.insert(portal.Attendance), batch)
+                    batch = []
+                if remaining == 0:
+                    break
+            if remaining == 0:
+                break
+        week += 1
+    if batch:
+        db.session.execute(db.insert(portal.Attendance), batch)
+    db.session.commit()
+
+    portal.rebuild_attendance_summary()
+    portal.backfill_attendance_change_seqs()
+    db.session.execute(db.text("ANALYZE"))
+    db.session.commit()
+
+    return {
+        'seconds': round(time.perf_counter() - started, 3),
+        'groups': len(groups),
+        'subSubgroups': len(sub_subgroups),
+        'students': len(students),
+        'slots': len(slots),
+        'attendance': args.attendance - remaining
+    }
+
+
+def table_sizes(portal):
+    # Bytes per table and index from SQLite's dbstat table, when the build includes it
+    try:
+        rows = portal.db.session.execute(portal.db.text(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY SUM(pgsize) DESC")).all()
+    except Exception:
+        portal.db.session.rollback()
+        return None
+    return {name: size for name, size in rows}
+
+
+def database_bytes(portal, path):
+    # Folds the WAL back into the main file first so the size covers every committed page;
+    # anything a busy reader kept in the WAL is still counted through the -wal file
+    portal.db.session.commit()
+    with portal.db.engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    return sum(os.path.getsize(p) for p in (path, path + '-wal') if os.path.exists(p))
+
+
+def parse_query_count(response_headers):
+    # Server-Timing: app;dur=1.2, db;dur=0.4;desc="3 queries"
+    header = response_headers.get('Server-Timing') or ''
+    marker = 'desc="'
+    if marker in header:
+        try:
+            return int(header.split(marker, 1)[1].split(' ', 1)[0])
+        except ValueError:
+            return None
+    return None
+
+
+def summarize(name, mode, latencies, statuses, query_counts, wall_seconds, concurrency=1):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+
+    def percentile(p):
+        if not latencies_ms:
+            return None
+        index = min(len(latencies_ms) - 1, int(round(p / 100 * (len(latencies_ms) - 1))))
+        return round(latencies_ms[index], 3)
+
+    counted = [count for count in query_counts if count is not None]
+    return {
+        'name': name,
+        'mode': mode,
+        'requests': len(latencies_ms),
+        'concurrency': concurrency,
+        'errors': sum(1 for status in statuses if status >= 400),
+        'statusCounts': {str(status): statuses.count(status) for status in sorted(set(statuses))},
+        'throughputRps': round(len(latencies_ms) / wall_seconds, 2) if wall_seconds else None,
+        'meanMs': round(statistics.mean(latencies_ms), 3) if latencies_ms else None,
+        'p50Ms': percentile(50),
+        'p95Ms': percentile(95),
+        'p99Ms': percentile(99),
+        'maxMs': round(latencies_ms[-1], 3) if latencies_ms else None,
+        'meanQueries': round(statistics.mean(counted), 2) if counted else None,
+        'maxQueries': max(counted) if counted else None
+    }
+
+
+def run_client_scenario(client, name, make_request, iterations):
+    latencies, statuses, query_counts = [], [], []
+    started = time.perf_counter()
+    for i in range(iterations):
+        request_started = time.perf_counter()
+        response = make_request(i)
+        response.get_data()
+        latencies.append(time.perf_counter() - request_started)
+        statuses.append(response.status_code)
+        query_counts.append(parse_query_count(response.headers))
+        response.close()
+    return summarize(name, 'test_client', latencies, statuses, query_counts, time.perf_counter() - started)
+
+
+def run_http_scenario(base_url, name, paths, concurrency):
+    def fetch(path):
+        request_started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=60) as response:
+                response.read()
+                status = response.status
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+            headers = e.headers
+        return time.perf_counter() - request_started, status, parse_query_count(headers)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, paths))
+    wall_seconds = time.perf_counter() - started
+    return summarize(
+        name, 'http',
+        [r[0] for r in results], [r[1] for r in results], [r[2] for r in results],
+        wall_seconds, concurrency
+    )
+
+
+def run_benchmarks(portal, args, rng):
+    app = portal.app
+    client = app.test_client()
+    results = []
+
+    # Mutating and export routes require the admin token
+    login = client.post('/api/admin/login', json={
+        'username': os.environ['ADMIN_USERNAME'], 'password': os.environ['ADMIN_PASSWORD']})
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {login.get_json()['token']}"
+
+    roll_nos = [roll_no for (roll_no,) in portal.db.session.query(portal.Student.roll_no)]
+    slot_rosters = {}
+    for slot_id, roll_no in portal.db.session.query(portal.SlotSubSubgroup.lab_slot_id, portal.Student.roll_no) \
+            .join(portal.Student, portal.Student.sub_subgroup_id == portal.SlotSubSubgroup.sub_subgroup_id):
+        slot_rosters.setdefault(slot_id, []).append(roll_no)
+    slot_ids = list(slot_rosters)
+    portal.db.session.remove()
+
+    lookups = [rng.choice(roll_nos) for _ in range(max(args.requests, args.http_requests))] if roll_nos else []
+
+    results.append(run_client_scenario(
+        client, 'public_schedule', lambda i: client.get('/api/public_schedule'), args.requests))
+
+    etag = client.get('/api/public_schedule').headers.get('ETag')
+    results.append(run_client_scenario(
+        client, 'public_schedule_conditional',
+        lambda i: client.get('/api/public_schedule', headers={'If-None-Match': etag}), args.requests))
+
+    if lookups:
+        results.append(run_client_scenario(
+            client, 'student_lookup', lambda i: client.get(f'/api/student_lookup/{lookups[i]}'), args.requests))
+        # Alternate roll-number prefixes with seeded name words
+        searches = [lookups[i][:-2] if i % 2 == 0 else f"student {lookups[i][-3:]}" for i in range(args.requests)]
+        results.append(run_client_scenario(
+            client, 'student_search', lambda i: client.get(f'/api/students/search?q={searches[i]}'), args.requests))
+
+    if slot_ids:
+        changes_cursor = portal.read_cache_version(portal.ATTENDANCE_CHANGE_SEQ)
+        portal.db.session.remove()
+
+        def save_attendance(i):
+            slot_id = slot_ids[i % len(slot_ids)]
+            return client.post('/api/attendance', json={
+                'slotId': slot_id,
+                'subSubgroupName': 'benchmark',
+                'attendanceRecords': [
+                    {'rollNo': roll_no, 'status': 'Present' if rng.random() < 0.8 else 'Absent'}
+                    for roll_no in slot_rosters[slot_id]
+                ]
+            })
+        results.append(run_client_scenario(client, 'attendance_save', save_attendance, args.requests))
+        results.append(run_client_scenario(
+            client, 'attendance_session',
+            lambda i: client.get(f'/api/attendance/session?slotId={slot_ids[i % len(slot_ids)]}'), args.requests))
+        # Incremental sync of just the marks saved above, a page at a time
+        results.append(run_client_scenario(
+            client, 'attendance_changes',
+            lambda i: client.get(f'/api/attendance/changes?since={changes_cursor}&limit=500'), args.requests))
+
+    sub_subgroup_names = [ssg['name'] for ssg in client.get('/api/subsubgroups/all').get_json()]
+    if sub_subgroup_names:
+        def upload_students(i):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(['Roll No', 'Name', 'Sub-subgroup'])
+            for j in range(args.upload_rows):
+                writer.writerow([f"9{i:03d}{j:06d}", f"Uploaded {i}-{j}", sub_subgroup_names[j % len(sub_subgroup_names)]])
+            data = {'file': (io.BytesIO(buffer.getvalue().encode('utf-8')), 'students.csv')}
+            return client.post('/api/students/upload', data=data, content_type='multipart/form-data')
+        results.append(run_client_scenario(client, 'students_upload', upload_students, args.upload_requests))
+
+    if slot_ids:
+        results.append(run_client_scenario(
+            client, 'attendance_export_slot_xlsx',
+            lambda i: client.get(f'/api/attendance/export?slotId={slot_ids[i % len(slot_ids)]}'), args.export_requests))
+        results.append(run_client_scenario(
+            client, 'attendance_export_all_csv',
+            lambda i: client.get('/api/attendance/export?format=csv'), args.export_requests))
+
+    if not args.skip_http:
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietRequestHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietRequestHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            results.append(run_http_scenario(
+                base_url, 'public_schedule', ['/api/public_schedule'] * args.http_requests, args.concurrency))
+            if lookups:
+                results.append(run_http_scenario(
+                    base_url, 'student_lookup',
+                    [f'/api/student_lookup/{roll_no}' for roll_no in lookups[:args.http_requests]], args.concurrency))
+        finally:
+            server.shutdown()
+
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    reuse = args.reuse and args.db and os.path.exists(args.db)
+    configure_environment(args)
+
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    import sqlalchemy
+    from backend import app as portal
+
+    with portal.app.app_context():
+        portal.create_tables_and_seed_data()
+        seed = None
+        if not reuse:
+            seed = seed_database(portal, args, rng)
+        results = run_benchmarks(portal, args, rng)
+        tables = table_sizes(portal)
+        size = database_bytes(portal, args.db)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'database': args.db,
+            'databaseBytes': size,
+            'tableBytes': tables,
+            'scale': {
+                'groups': args.groups,
+                'subSubgroupsPerGroup': args.subsubgroups_per_group,
+                'students': args.students,
+                'slots': args.slots,
+                'attendance': args.attendance
+            },
+            'seed': args.seed
+        },
+        'seeding': seed,
+        'results': results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# backend/app.py reads its configuration at import time, so the environment is set up
+# first. The app always runs on a throwaway SQLite file here; set TEST_POSTGRES_URL to a
+# scratch PostgreSQL database to also run the tests that take the `database_app` fixture
+# against it (its tables are dropped and recreated for every test).
+_scratch_dir = tempfile.mkdtemp(prefix='lab_portal_tests_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_scratch_dir, 'lab_portal.db')
+os.environ['EXPORT_DIR'] = os.path.join(_scratch_dir, 'exports')
+os.environ['ARCHIVE_DIR'] = os.path.join(_scratch_dir, 'archives')
+os.environ['FLASK_SECRET_KEY'] = 'test-secret'
+os.environ['ADMIN_USERNAME'] = 'admin'
+os.environ['ADMIN_PASSWORD'] = 'test-password'
+os.environ['PUBLIC_RATE_LIMIT_PER_SECOND'] = '0'
+os.environ['REFERENCE_CACHE_CHECK_INTERVAL'] = '0'
+os.environ.pop('RATE_LIMIT_SQLITE_PATH', None)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from flask import Flask
+from backend import app as portal
+
+_postgres_apps = {}
+
+
+def reset_worker_caches():
+    # Worker caches are keyed by CacheVersion counters, which restart with every fresh database
+    portal._reference_cache.update(version=None, checked_at=0.0, data=None)
+    portal._student_index.update(version=None, checked_at=0.0, index=None)
+    portal._auth_cache.clear()
+    portal._auth_cache_state.update(version=None, checked_at=0.0)
+    portal._login_attempts.clear()
+    portal._session_bundle_cache.clear()
+    portal._compressed_bodies.clear()
+    portal._archive_terms.update(version=None, checked_at=0.0, terms=None)
+    portal._archive_rosters.clear()
+
+
+def fresh_database():
+    portal.db.drop_all()
+    portal.create_tables_and_seed_data()
+    reset_worker_caches()
+
+
+def get_postgres_app(url):
+    # A second app bound to PostgreSQL; the portal's functions only need its app context
+    if url not in _postgres_apps:
+        postgres_app = Flask('backend.app')
+        postgres_app.config.update(portal.app.config)
+        postgres_app.config['SQLALCHEMY_DATABASE_URI'] = url
+        postgres_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+        portal.db.init_app(postgres_app)
+        _postgres_apps[url] = postgres_app
+    return _postgres_apps[url]
+
+
+@pytest.fixture
+def app():
+    with portal.app.app_context():
+        fresh_database()
+        yield portal.app
+        portal.db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'test-password'})
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {response.get_json()['token']}"
+    return client
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def database_app(request):
+    if request.param == 'postgresql':
+        url = os.getenv('TEST_POSTGRES_URL')
+        if not url:
+            pytest.skip('TEST_POSTGRES_URL is not set')
+        target = get_postgres_app(url)
+    else:
+        target = portal.app
+    with target.app_context():
+        fresh_database()
+        yield target
+        portal.db.session.remove()
@@ -0,0 +1,207 @@
+import csv
+import io
+import os
+import time
+
+import pytest
+from sqlalchemy import event
+
+from backend import app as portal
+from backend.app import (
+    db, Group, SubSubgroup, LabSlot, Student, Attendance, AttendanceSummary, ATTENDANCE_CHANGE_FLOOR,
+    upsert_attendance_rows, record_attendance_deletions, read_cache_version, archive_term, archive_path,
+    get_archive_session
+)
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(portal.app.config, 'ARCHIVE_DIR', str(tmp_path))
+    yield tmp_path
+    for engine in portal._archive_engines.values():
+        engine.dispose()
+    portal._archive_engines.clear()
+
+
+@pytest.fixture
+def foreign_keys(database_app):
+    # PostgreSQL always enforces foreign keys; SQLite only on connections that ask for it
+    if db.engine.dialect.name != 'sqlite':
+        yield
+        return
+
+    def enable(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+    db.session.remove()
+    db.engine.dispose()
+    event.listen(db.engine, 'connect', enable)
+    yield
+    db.session.remove()
+    event.remove(db.engine, 'connect', enable)
+    db.engine.dispose()
+
+
+def seed_term():
+    # 102 has marks before and after the cut-off; 103 only before it
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    sub_subgroup = SubSubgroup(name='2C22-A', group_id=group.id)
+    slot = LabSlot(course='UCS', lab='L1', day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+    db.session.add_all([sub_subgroup, slot])
+    db.session.flush()
+    db.session.add_all([
+        Student(roll_no='102', name='Al', sub_subgroup_id=sub_subgroup.id),
+        Student(roll_no='103', name='Bo', sub_subgroup_id=sub_subgroup.id)
+    ])
+    upsert_attendance_rows([
+        mark(slot.key, sub_subgroup.key, '102', '2024-01-01', 'Present'),
+        mark(slot.key, sub_subgroup.key, '102', '2024-08-01', 'Present'),
+        mark(slot.key, sub_subgroup.key, '103', '2024-01-01', 'Absent'),
+        mark(slot.key, sub_subgroup.key, '103', '2024-01-08', 'Present')
+    ])
+    db.session.commit()
+    return slot.key, sub_subgroup.key
+
+
+def mark(slot_key, sub_subgroup_key, roll_no, date_str, status):
+    return {
+        'roll_no': roll_no, 'lab_slot_key': slot_key, 'sub_subgroup_key': sub_subgroup_key,
+        'date': date_str, 'status': status, 'marked_by': 'admin', 'marked_at': f"{date_str}T10:00:00"
+    }
+
+
+def archived_marks(term):
+    return sorted(get_archive_session(term).query(Attendance.roll_no, Attendance.date, Attendance.status).all())
+
+
+def test_clear_roster_under_foreign_keys(foreign_keys):
+    seed_term()
+    floor = read_cache_version(ATTENDANCE_CHANGE_FLOOR)
+
+    info = archive_term('2024-spring', '2024-06-30', clear_roster=True)
+
+    assert (info['attendanceRows'], info['liveRowsDeleted'], info['studentsRemoved']) == (3, 3, 1)
+    assert [student.roll_no for student in Student.query.all()] == ['102']
+    assert [(row.roll_no, row.sessions) for row in AttendanceSummary.query.all()] == [('102', 1)]
+    assert read_cache_version(ATTENDANCE_CHANGE_FLOOR) > floor
+    assert archived_marks('2024-spring') == [
+        ('102', '2024-01-01', 'Present'), ('103', '2024-01-01', 'Absent'), ('103', '2024-01-08', 'Present')
+    ]
+
+
+def test_marks_changed_after_the_copy_are_not_archived(database_app, monkeypatch):
+    slot_key, ssg_key = seed_term()
+    write_term_archive = portal._write_term_archive
+
+    def write_then_change_marks(*args):
+        head_seq = write_term_archive(*args)
+        upsert_attendance_rows([mark(slot_key, ssg_key, '102', '2024-01-01', 'Absent')])
+        deleted = Attendance.query.filter_by(roll_no='103', date='2024-01-08')
+        record_attendance_deletions(deleted)
+        deleted.delete(synchronize_session=False)
+        db.session.commit()
+        return head_seq
+
+    monkeypatch.setattr(portal, '_write_term_archive', write_then_change_marks)
+    info = archive_term('2024-spring', '2024-06-30')
+
+    assert info['attendanceRows'] == 1
+    assert archived_marks('2024-spring') == [('103', '2024-01-01', 'Absent')]
+    live = sorted((row.roll_no, row.date, row.status) for row in Attendance.query.all())
+    assert live == [('102', '2024-01-01', 'Absent'), ('102', '2024-08-01', 'Present')]
+
+
+def test_stopped_archive_run_can_be_resumed(database_app, monkeypatch):
+    seed_term()
+
+    def fail():
+        raise RuntimeError('stopped')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(portal, 'rebuild_attendance_summary', fail)
+        with pytest.raises(RuntimeError):
+            archive_term('2024-spring', '2024-06-30', clear_roster=True)
+    db.session.rollback()
+    assert not os.path.exists(archive_path('2024-spring'))
+    assert os.path.exists(archive_path('2024-spring') + '.part')
+    with pytest.raises(FileExistsError):
+        archive_term('2024-spring', '2024-06-30', clear_roster=True)
+
+    info = archive_term('2024-spring', clear_roster=True, resume=True)
+
+    assert (info['attendanceRows'], info['studentsRemoved']) == (3, 1)
+    assert Attendance.query.count() == 1
+    assert [row.roll_no for row in AttendanceSummary.query.all()] == ['102']
+
+
+def test_lookups_reuse_the_archive_term_list(client, monkeypatch):
+    seed_term()
+    archive_term('2024-spring', '2024-06-30')
+    monkeypatch.setitem(client.application.config, 'REFERENCE_CACHE_CHECK_INTERVAL', 60)
+    listdir_calls = []
+    listdir = os.listdir
+    monkeypatch.setattr(portal.os, 'listdir', lambda path: listdir_calls.append(path) or listdir(path))
+
+    for _ in range(3):
+        response = client.get('/api/student_lookup/102')
+        assert response.get_json()['archivedTerms'] == ['2024-spring']
+    assert len(listdir_calls) == 1
+
+
+def test_archive_api_and_term_lookup(client):
+    seed_term()
+    body = {'term': '2024-spring', 'endDate': '2024-06-30', 'clearRoster': True}
+
+    response = client.post('/api/admin/archives', json=body)
+    assert response.status_code == 201
+    assert (response.get_json()['attendanceRows'], response.get_json()['studentsRemoved']) == (3, 1)
+    assert client.post('/api/admin/archives', json=body).status_code == 409
+    assert client.post('/api/admin/archives', json={'term': '2024 spring'}).status_code == 400
+    assert client.post('/api/admin/archives', json={'term': '2024-fall', 'endDate': '30/06/2024'}).status_code == 400
+    assert [(info['term'], info['attendanceRows']) for info in client.get('/api/admin/archives').get_json()] == [
+        ('2024-spring', 3)
+    ]
+
+    # 103 left the live roster but is still found in the term's archive
+    live = client.get('/api/student_lookup/103', headers={'Authorization': ''})
+    assert live.status_code == 404
+    assert live.get_json()['archivedTerms'] == ['2024-spring']
+    archived = client.get('/api/student_lookup/103?term=2024-spring', headers={'Authorization': ''}).get_json()
+    assert archived['term'] == '2024-spring'
+    assert [(record['date'], record['status']) for record in archived['attendanceRecords']] == [
+        ('2024-01-08', 'Present'), ('2024-01-01', 'Absent')
+    ]
+    assert archived['attendanceTotals'][0]['total'] == 2
+
+    current = client.get('/api/student_lookup/102', headers={'Authorization': ''}).get_json()
+    assert [record['date'] for record in current['attendanceRecords']] == ['2024-08-01']
+    assert current['archivedTerms'] == ['2024-spring']
+
+
+def test_exports_read_an_archived_term(client):
+    seed_term()
+    archive_term('2024-spring', '2024-06-30')
+
+    def exported(response):
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))[1:]
+        return sorted((row[0], row[7], row[8]) for row in rows)
+
+    archived = [('102', '2024-01-01', 'Present'), ('103', '2024-01-01', 'Absent'), ('103', '2024-01-08', 'Present')]
+    response = client.get('/api/attendance/export?format=csv&term=2024-spring')
+    assert 'attendance_export_2024-spring_' in response.headers['Content-Disposition']
+    assert exported(response) == archived
+    assert exported(client.get('/api/attendance/export?format=csv')) == [('102', '2024-08-01', 'Present')]
+    assert client.get('/api/attendance/export?format=csv&term=2023-fall').status_code == 404
+
+    job = client.post('/api/attendance/export', json={'format': 'csv', 'term': '2024-spring'}).get_json()
+    deadline = time.monotonic() + 10
+    while job['status'] in ('queued', 'running'):
+        assert time.monotonic() < deadline, job
+        time.sleep(0.02)
+        job = client.get(job['statusUrl']).get_json()
+    assert (job['status'], job['rowsTotal']) == ('done', 3)
+    assert exported(client.get(job['downloadUrl'])) == archived
+    assert client.post('/api/attendance/export', json={'format': 'csv', 'term': '2023-fall'}).status_code == 404
@@ -0,0 +1,170 @@
+import datetime
+import io
+import json
+import re
+
+from backend.app import db, Group, SubSubgroup, LabSlot, SlotSubSubgroup, Student, Attendance, AttendanceSummary
+
+
+def seed_slot(students=('102', '103')):
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    sub_subgroup = SubSubgroup(name='2C22-A', group_id=group.id)
+    slot = LabSlot(course='UCS', lab='L1', day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+    db.session.add_all([sub_subgroup, slot])
+    db.session.flush()
+    db.session.add(SlotSubSubgroup(lab_slot_id=slot.id, sub_subgroup_id=sub_subgroup.id))
+    db.session.add_all(Student(roll_no=roll_no, name=f"Student {roll_no}", sub_subgroup_id=sub_subgroup.id)
+                       for roll_no in students)
+    db.session.commit()
+    return slot.id
+
+
+def save(client, slot_id, statuses):
+    return client.post('/api/attendance', json={
+        'slotId': slot_id,
+        'subSubgroupName': '2C22-A',
+        'attendanceRecords': [{'rollNo': roll_no, 'status': status} for roll_no, status in statuses.items()]
+    })
+
+
+def query_count(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+
+def marks():
+    return {row.roll_no: row.status for row in Attendance.query.all()}
+
+
+def test_save_attendance_overwrites_todays_marks(client):
+    slot_id = seed_slot()
+
+    assert save(client, slot_id, {'102': 'present', '103': 'Absent', '999': 'Present'}).status_code == 200
+    assert save(client, slot_id, {'103': 'PRESENT'}).status_code == 200
+
+    assert marks() == {'102': 'Present', '103': 'Present'}
+    assert {row.date for row in Attendance.query.all()} == {datetime.date.today().isoformat()}
+    assert {(row.roll_no, row.sessions, row.present) for row in AttendanceSummary.query.all()} == {
+        ('102', 1, 1), ('103', 1, 1)
+    }
+
+
+def test_save_attendance_rejects_the_whole_request(client):
+    slot_id = seed_slot()
+
+    assert save(client, slot_id, {'102': 'Present', '103': 'Late'}).status_code == 400
+    assert save(client, 'no-such-slot', {'102': 'Present'}).status_code == 404
+    assert client.post('/api/attendance', json={'slotId': slot_id}).status_code == 400
+    assert marks() == {}
+
+
+def test_save_attendance_query_count_does_not_grow_with_students(client):
+    slot_id = seed_slot(students=[str(100 + i) for i in range(40)])
+
+    save(client, slot_id, {'100': 'Present'})  # loads the worker's caches
+    few = save(client, slot_id, {'100': 'Present', '101': 'Absent'})
+    many = save(client, slot_id, {str(100 + i): 'Present' for i in range(40)})
+
+    assert few.status_code == many.status_code == 200
+    assert query_count(many) == query_count(few)
+    assert len(marks()) == 40
+
+
+def test_bulk_ingest_ndjson_reports_bad_rows_and_saves_the_rest(client, monkeypatch):
+    slot_id = seed_slot()
+    # Several chunks, each committed on its own
+    monkeypatch.setitem(client.application.config, 'BULK_ATTENDANCE_CHUNK_SIZE', 2)
+    lines = [
+        {'rollNo': '102', 'slotId': slot_id, 'date': '2024-01-01', 'status': 'Absent'},
+        {'rollNo': '102', 'slotId': slot_id, 'date': '2024-01-01', 'status': 'present', 'markedBy': 'ta'},
+        {'rollNo': '103', 'slotId': slot_id, 'date': '2024-01-01', 'status': 'Absent'},
+        {'rollNo': '999', 'slotId': slot_id, 'date': '2024-01-01', 'status': 'Present'},
+        {'rollNo': '103', 'slotId': 'no-such-slot', 'date': '2024-01-01', 'status': 'Present'},
+        {'rollNo': '103', 'slotId': slot_id, 'date': '01/08/2024', 'status': 'Present'},
+        {'rollNo': '103', 'slotId': slot_id, 'date': '2024-01-08', 'status': 'Late'},
+        {'rollNo': '103', 'slotId': slot_id, 'date': '2024-01-15', 'status': 'Present'},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines) + '\n{not json\n'
+
+    response = client.post('/api/attendance/bulk', data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 202
+    result = response.get_json()
+    assert (result['processed'], result['upserted'], result['errorCount']) == (9, 3, 5)
+    assert [error['row'] for error in result['errors']] == [4, 5, 6, 7, 9]
+    saved = {(row.roll_no, row.date): (row.status, row.marked_by) for row in Attendance.query.all()}
+    assert saved == {
+        ('102', '2024-01-01'): ('Present', 'ta'),
+        ('103', '2024-01-01'): ('Absent', 'admin'),
+        ('103', '2024-01-15'): ('Present', 'admin'),
+    }
+    assert {(row.roll_no, row.sessions) for row in AttendanceSummary.query.all()} == {('102', 1), ('103', 2)}
+
+
+def test_bulk_ingest_csv_upload(client):
+    slot_id = seed_slot()
+    upload = f"rollNo,slotId,date,status\n102,{slot_id},2024-01-01,Present\n103,{slot_id},2024-01-01,Absent\n"
+
+    response = client.post('/api/attendance/bulk', data={'file': (io.BytesIO(upload.encode('utf-8')), 'marks.csv')})
+
+    assert response.status_code == 200
+    assert response.get_json()['upserted'] == 2
+    assert marks() == {'102': 'Present', '103': 'Absent'}
+    bad_headers = client.post('/api/attendance/bulk', data='roll,slot\n102,x\n', content_type='text/csv')
+    assert bad_headers.status_code == 400
+
+
+def changes(client, since, limit=None):
+    url = f"/api/attendance/changes?since={since}" + (f"&limit={limit}" if limit else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_changes_feed_pages_updates_and_deletions_in_order(client):
+    slot_id = seed_slot(students=('102', '103', '104'))
+    save(client, slot_id, {'102': 'Present', '103': 'Present', '104': 'Present'})
+
+    first = changes(client, 0, limit=2)
+    second = changes(client, first['cursor'], limit=2)
+    assert (first['hasMore'], second['hasMore']) == (True, False)
+    synced = {change['rollNo']: change for change in first['changes'] + second['changes']}
+    assert sorted(synced) == ['102', '103', '104']
+    assert {change['slotId'] for change in synced.values()} == {slot_id}
+
+    save(client, slot_id, {'102': 'Absent'})
+    assert client.delete('/api/students/103').status_code == 200
+    latest = changes(client, second['cursor'])
+    assert [(change['rollNo'], change['status']) for change in latest['changes']] == [('102', 'Absent')]
+    assert latest['deleted'] == [{
+        'seq': latest['deleted'][0]['seq'], 'id': synced['103']['id'], 'rollNo': '103',
+        'slotId': slot_id, 'date': synced['103']['date']
+    }]
+    assert latest['changes'][0]['seq'] < latest['deleted'][0]['seq'] <= latest['cursor']
+    assert changes(client, latest['cursor']) == {
+        'reset': False, 'changes': [], 'deleted': [], 'cursor': latest['cursor'], 'hasMore': False
+    }
+    # A full sync sees each live mark once, at its latest state
+    assert sorted((change['rollNo'], change['status']) for change in changes(client, 0)['changes']) == [
+        ('102', 'Absent'), ('104', 'Present')
+    ]
+
+
+def test_changes_feed_resets_cursors_it_can_no_longer_serve(client, monkeypatch):
+    slot_id = seed_slot(students=('102', '103', '104'))
+    save(client, slot_id, {'102': 'Present', '103': 'Present', '104': 'Present'})
+    cursor = changes(client, 0)['cursor']
+    assert changes(client, cursor + 1)['reset'] is True
+
+    # Tombstones past their retention are pruned, and cursors before them resync
+    monkeypatch.setitem(client.application.config, 'ATTENDANCE_TOMBSTONE_RETENTION_DAYS', -1)
+    client.delete('/api/students/103')
+    assert changes(client, cursor)['reset'] is True
+    assert changes(client, 0)['deleted'] == []
+
+    cursor = changes(client, 0)['cursor']
+    assert client.post('/api/admin/reset').status_code == 200
+    assert changes(client, cursor)['reset'] is True
+    after_reset = changes(client, 0)
+    assert (after_reset['reset'], after_reset['changes'], after_reset['deleted']) == (False, [], [])
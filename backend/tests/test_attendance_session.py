@@ -0,0 +1,21 @@
+def test_slot_and_day_session_requests_have_distinct_etags(client):
+    client.post('/api/groups', json={'name': '2C22'})
+    slot = client.post('/api/slots', json={
+        'course': 'UCS', 'lab': 'L1', 'day': 'Monday', 'time': '8:00 AM - 8:50 AM',
+        'groupName': ['2C22'], 'subSubgroups': ['2C22-A']
+    }).get_json()
+
+    by_slot = client.get(f"/api/attendance/session?slotId={slot['id']}&date=2024-01-01")
+    by_day = client.get('/api/attendance/session?day=Monday&date=2024-01-01')
+    assert by_slot.status_code == by_day.status_code == 200
+    assert by_slot.get_json()['slot']['id'] == slot['id']
+    assert [session['slot']['id'] for session in by_day.get_json()['sessions']] == [slot['id']]
+    assert by_slot.headers['ETag'] != by_day.headers['ETag']
+
+    # Each ETag still revalidates its own request
+    repeat = client.get(f"/api/attendance/session?slotId={slot['id']}&date=2024-01-01",
+                        headers={'If-None-Match': by_slot.headers['ETag']})
+    assert repeat.status_code == 304
+    other = client.get('/api/attendance/session?day=Monday&date=2024-01-01',
+                       headers={'If-None-Match': by_slot.headers['ETag']})
+    assert other.status_code == 200
@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    '/api/attendance/summary',
+    '/api/attendance/export',
+    '/api/attendance/changes',
+    '/api/admin/archives',
+    '/api/students',
+    '/api/attendance/students?slotId=x&subSubgroup=y',
+])
+def test_admin_endpoints_require_token(client, url):
+    assert client.get(url, headers={'Authorization': ''}).status_code == 401
+    assert client.get(url, headers={'Authorization': 'Bearer not-a-token'}).status_code == 401
+
+
+def test_attendance_summary_with_token(client):
+    response = client.get('/api/attendance/summary')
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+
+def test_failed_logins_elsewhere_do_not_lock_out_the_admin(client, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'LOGIN_MAX_ATTEMPTS', 3)
+    attacker = {'REMOTE_ADDR': '203.0.113.9'}
+    for _ in range(3):
+        response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'guess'},
+                               environ_overrides=attacker)
+        assert response.status_code == 401
+    response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'guess'},
+                           environ_overrides=attacker)
+    assert response.status_code == 429
+    assert response.headers['Retry-After']
+
+    response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'test-password'},
+                           environ_overrides={'REMOTE_ADDR': '198.51.100.7'})
+    assert response.status_code == 200
@@ -0,0 +1,22 @@
+import gzip
+import json
+
+from backend.app import compress_response
+
+
+def compressed_body(app, path, payload, etag):
+    with app.test_request_context(path, headers={'Accept-Encoding': 'gzip'}):
+        response = app.response_class(json.dumps(payload), mimetype='application/json')
+        response.set_etag(etag)
+        response = compress_response(response)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        return json.loads(gzip.decompress(response.get_data()))
+
+
+def test_compressed_body_cache_is_per_url(app):
+    first = {'slot': ['a' * 10] * 100}
+    second = {'day': ['b' * 10] * 100}
+    assert compressed_body(app, '/api/x?slotId=1', first, 'same-etag') == first
+    assert compressed_body(app, '/api/x?day=Monday', second, 'same-etag') == second
+    # A repeat request is served from the cache
+    assert compressed_body(app, '/api/x?slotId=1', first, 'same-etag') == first
@@ -0,0 +1,114 @@
+from backend.app import (
+    db, Group, SubSubgroup, LabSlot, Student, Attendance, AttendanceSummary, CacheVersion,
+    upsert_attendance_rows, refresh_attendance_summary, bump_cache_version, read_cache_version,
+    reset_all_data
+)
+
+
+def seed_roster():
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    sub_subgroup = SubSubgroup(name='2C22-A', group_id=group.id)
+    slot = LabSlot(course='UCS', lab='L1', day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+    db.session.add_all([sub_subgroup, slot])
+    db.session.flush()
+    db.session.add_all([
+        Student(roll_no='102', name='Al', sub_subgroup_id=sub_subgroup.id),
+        Student(roll_no='103', name='Bo', sub_subgroup_id=sub_subgroup.id)
+    ])
+    db.session.commit()
+    return slot.key, sub_subgroup.key
+
+
+def mark(slot_key, sub_subgroup_key, roll_no, date_str, status, marked_by='admin'):
+    return {
+        'roll_no': roll_no, 'lab_slot_key': slot_key, 'sub_subgroup_key': sub_subgroup_key,
+        'date': date_str, 'status': status, 'marked_by': marked_by,
+        'marked_at': f"{date_str}T10:00:00"
+    }
+
+
+def test_upsert_attendance_rows_inserts_then_overwrites(database_app):
+    slot_key, ssg_key = seed_roster()
+    upsert_attendance_rows([
+        mark(slot_key, ssg_key, '102', '2024-01-01', 'Present'),
+        mark(slot_key, ssg_key, '103', '2024-01-01', 'Absent')
+    ])
+    db.session.commit()
+    first_seq = db.session.query(Attendance.change_seq).filter_by(roll_no='102').scalar()
+
+    upsert_attendance_rows([mark(slot_key, ssg_key, '102', '2024-01-01', 'Absent', marked_by='other')],
+                           update_marked_by=True)
+    db.session.commit()
+
+    rows = {row.roll_no: row for row in Attendance.query.all()}
+    assert len(rows) == 2
+    assert rows['102'].status == 'Absent'
+    assert rows['102'].marked_by == 'other'
+    assert rows['102'].date == '2024-01-01'
+    assert rows['102'].change_seq > first_seq
+    assert rows['103'].status == 'Absent'
+
+
+def test_refresh_attendance_summary_upserts_totals(database_app):
+    slot_key, ssg_key = seed_roster()
+    upsert_attendance_rows([
+        mark(slot_key, ssg_key, '102', '2024-01-01', 'Present'),
+        mark(slot_key, ssg_key, '102', '2024-01-08', 'Absent')
+    ])
+    db.session.commit()
+    summary = AttendanceSummary.query.filter_by(roll_no='102', lab_slot_key=slot_key).one()
+    assert (summary.sessions, summary.present, summary.absent, summary.last_date) == (2, 1, 1, '2024-01-08')
+
+    # Change the marks behind the summary's back, then refresh the existing row in place
+    Attendance.query.filter_by(roll_no='102').update({'status': 'Present'}, synchronize_session=False)
+    refresh_attendance_summary(slot_key, ['102', '102', '103'])
+    db.session.commit()
+    db.session.expire_all()
+
+    summaries = AttendanceSummary.query.all()
+    assert len(summaries) == 1
+    assert (summaries[0].sessions, summaries[0].present, summaries[0].absent) == (2, 2, 0)
+
+
+def test_bump_cache_version_creates_then_increments(database_app):
+    assert read_cache_version('test_counter') == 0
+    bump_cache_version('test_counter')
+    bump_cache_version('test_counter', 5)
+    db.session.commit()
+    assert read_cache_version('test_counter') == 6
+    assert CacheVersion.query.filter_by(name='test_counter').count() == 1
+
+
+def test_reset_all_data_clears_students_and_attendance(database_app):
+    slot_key, ssg_key = seed_roster()
+    upsert_attendance_rows([mark(slot_key, ssg_key, '102', '2024-01-01', 'Present')])
+    db.session.commit()
+
+    with database_app.test_request_context('/api/admin/reset', method='POST'):
+        response, status = reset_all_data.__wrapped__()
+    assert status == 200, response.get_json()
+
+    assert Student.query.count() == 0
+    assert Attendance.query.count() == 0
+    assert AttendanceSummary.query.count() == 0
+    assert LabSlot.query.count() == 1
+
+
+def test_reference_keys_are_never_reused(database_app):
+    slot_key, ssg_key = seed_roster()
+    upsert_attendance_rows([mark(slot_key, ssg_key, '102', '2024-01-01', 'Present')])
+    db.session.commit()
+    public_id = Attendance.query.one().public_id
+
+    AttendanceSummary.query.delete()
+    Attendance.query.delete()
+    db.session.delete(LabSlot.query.filter_by(key=slot_key).one())
+    slot = LabSlot(course='UCS', lab='L2', day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+    db.session.add(slot)
+    db.session.commit()
+
+    assert slot.key == slot_key + 1
+    assert Attendance.query.filter_by(public_id=public_id).count() == 0
+    assert len(public_id) == 36
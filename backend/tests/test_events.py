@@ -0,0 +1,52 @@
+from backend.app import app as portal_app, db, record_change, _event_subscribers
+
+
+def test_default_stream_cap_leaves_room_for_requests():
+    assert portal_app.config['EVENTS_MAX_SUBSCRIBERS'] == max(1, portal_app.config['GUNICORN_WORKER_CONNECTIONS'] // 2)
+
+
+def test_one_change_reaches_every_open_stream(client):
+    streams = []
+    try:
+        for _ in range(3):
+            response = client.get('/api/events?topics=slot', buffered=False)
+            assert response.status_code == 200
+            assert next(response.response) == b'retry: 3000\n\n'
+            assert next(response.response).startswith(b'id: ')
+            streams.append(response)
+
+        record_change('slot', 'deleted', {'id': 'slot-1'})
+        db.session.commit()
+        for response in streams:
+            message = next(response.response).decode()
+            assert 'event: slot' in message
+            assert '"action":"deleted","data":{"id":"slot-1"}' in message
+    finally:
+        for response in streams:
+            response.close()
+
+
+def test_event_streams_beyond_the_cap_are_refused(client, monkeypatch):
+    monkeypatch.setitem(portal_app.config, 'EVENTS_MAX_SUBSCRIBERS', 2)
+    streams = []
+    try:
+        for _ in range(2):
+            response = client.get('/api/events?topics=slot', buffered=False)
+            assert response.status_code == 200
+            next(response.response)  # starts the stream
+            streams.append(response)
+
+        refused = client.get('/api/events?topics=slot')
+        assert refused.status_code == 503
+        assert refused.headers['Retry-After']
+
+        streams.pop().close()
+        assert len(_event_subscribers) == 1
+        response = client.get('/api/events?topics=slot', buffered=False)
+        assert response.status_code == 200
+        next(response.response)
+        streams.append(response)
+    finally:
+        for response in streams:
+            response.close()
+    assert not _event_subscribers
@@ -0,0 +1,130 @@
+import csv
+import io
+import time
+from types import SimpleNamespace
+
+from openpyxl import load_workbook
+
+from backend import app as portal
+from backend.app import db, Group, SubSubgroup, LabSlot, Student, upsert_attendance_rows
+
+
+def seed_marks():
+    # Two slots; 102 is marked in both, 103 only in the first
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    sub_subgroup = SubSubgroup(name='2C22-A', group_id=group.id)
+    slots = [LabSlot(course=course, lab=lab, day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+             for course, lab in (('UCS101', 'L1'), ('UCS102', 'L2'))]
+    db.session.add_all([sub_subgroup, *slots])
+    db.session.flush()
+    db.session.add_all([
+        Student(roll_no='102', name='Al', sub_subgroup_id=sub_subgroup.id),
+        Student(roll_no='103', name='Bo', sub_subgroup_id=sub_subgroup.id)
+    ])
+    upsert_attendance_rows([{
+        'roll_no': roll_no, 'lab_slot_key': slot.key, 'sub_subgroup_key': sub_subgroup.key,
+        'date': date_str, 'status': status, 'marked_by': 'admin', 'marked_at': f"{date_str}T10:00:00"
+    } for slot, roll_no, date_str, status in (
+        (slots[0], '102', '2024-01-01', 'Present'),
+        (slots[0], '103', '2024-01-01', 'Absent'),
+        (slots[0], '102', '2024-01-08', 'Absent'),
+        (slots[1], '102', '2024-01-02', 'Present'),
+    )])
+    db.session.commit()
+    return [slot.id for slot in slots]
+
+
+def csv_rows(response):
+    assert response.status_code == 200, response.get_json()
+    assert response.mimetype == 'text/csv'
+    return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+
+def test_csv_export_streams_joined_rows_newest_first(client):
+    first_slot, _ = seed_marks()
+
+    rows = csv_rows(client.get(f"/api/attendance/export?format=csv&slotId={first_slot}"))
+
+    assert rows[0][:3] == ['Roll No', 'Student Name', 'Sub-subgroup']
+    dates = [row[7] for row in rows[1:]]
+    assert dates == sorted(dates, reverse=True)
+    assert sorted(row[:2] + row[3:5] + row[7:9] for row in rows[1:]) == [
+        ['102', 'Al', 'UCS101', 'L1', '2024-01-01', 'Present'],
+        ['102', 'Al', 'UCS101', 'L1', '2024-01-08', 'Absent'],
+        ['103', 'Bo', 'UCS101', 'L1', '2024-01-01', 'Absent'],
+    ]
+
+
+def test_export_date_range_and_xlsx(client):
+    seed_marks()
+
+    rows = csv_rows(client.get('/api/attendance/export?format=csv&startDate=2024-01-02&endDate=2024-01-07'))
+    assert [(row[0], row[3], row[7]) for row in rows[1:]] == [('102', 'UCS102', '2024-01-02')]
+
+    response = client.get('/api/attendance/export')
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.data), read_only=True)['Attendance']
+    assert len(list(sheet.iter_rows(values_only=True))) == 5
+
+
+def test_export_rejects_bad_filters(client):
+    seed_marks()
+    assert client.get('/api/attendance/export?format=pdf').status_code == 400
+    assert client.get('/api/attendance/export?startDate=01-01-2024').status_code == 400
+    assert client.get('/api/attendance/export?format=csv&startDate=2025-01-01').status_code == 404
+    assert client.get('/api/attendance/export?format=csv&slotId=no-such-slot').status_code == 404
+
+
+def wait_for_export(client, job):
+    deadline = time.monotonic() + 10
+    while job['status'] in ('queued', 'running'):
+        assert time.monotonic() < deadline, job
+        time.sleep(0.02)
+        job = client.get(job['statusUrl']).get_json()
+    return job
+
+
+def test_export_job_runs_in_the_background_and_serves_the_file(client, monkeypatch):
+    first_slot, _ = seed_marks()
+
+    response = client.post('/api/attendance/export', json={'format': 'csv', 'slotId': first_slot})
+    assert response.status_code == 202
+    job = wait_for_export(client, response.get_json())
+
+    assert (job['status'], job['rowsTotal'], job['rowsWritten'], job['progress']) == ('done', 3, 3, 1)
+    rows = csv_rows(client.get(job['downloadUrl']))
+    assert len(rows) == 4
+
+    portal.cleanup_export_results()
+    assert client.get(job['statusUrl']).status_code == 200
+    monkeypatch.setitem(client.application.config, 'EXPORT_RESULT_TTL', -1)
+    portal.cleanup_export_results()
+    assert client.get(job['statusUrl']).status_code == 404
+
+
+def test_export_job_without_rows_fails(client):
+    seed_marks()
+    response = client.post('/api/attendance/export', json={'format': 'csv', 'startDate': '2025-01-01'})
+    job = wait_for_export(client, response.get_json())
+    assert job['status'] == 'failed'
+    assert 'No attendance data' in job['error']
+    assert client.get(f"/api/attendance/export/{job['jobId']}/download").status_code == 409
+
+
+def test_identical_pending_export_requests_share_a_job(client, monkeypatch):
+    seed_marks()
+    # Jobs stay queued, and are forgotten after the test
+    monkeypatch.setattr(portal, '_export_executor', SimpleNamespace(submit=lambda *args: None))
+    monkeypatch.setattr(portal, '_export_jobs', {})
+    monkeypatch.setattr(portal, '_export_jobs_by_key', {})
+
+    first = client.post('/api/attendance/export', json={'format': 'csv'}).get_json()
+    second = client.post('/api/attendance/export', json={'format': 'csv'}).get_json()
+    other = client.post('/api/attendance/export', json={'format': 'xlsx'}).get_json()
+
+    assert first['jobId'] == second['jobId'] != other['jobId']
+    assert client.get(f"/api/attendance/export/{first['jobId']}/download").status_code == 409
+    assert client.get('/api/attendance/export/no-such-job').status_code == 404
+    assert client.post('/api/attendance/export', json={'format': 'pdf'}).status_code == 400
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.app import db
+
+
+def test_failed_statement_leaves_no_timing_state(app):
+    connection = db.session.connection()
+    with pytest.raises(OperationalError):
+        connection.exec_driver_sql("SELECT * FROM no_such_table")
+    assert 'query_started' not in connection.info
+    db.session.rollback()
+
+    connection = db.session.connection()
+    connection.exec_driver_sql("SELECT 1")
+    assert 'query_started' not in connection.info
+
+
+def test_metrics_require_an_admin_or_metrics_token(client, monkeypatch):
+    assert client.get('/metrics', headers={'Authorization': ''}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics').status_code == 200
+
+    monkeypatch.setitem(client.application.config, 'METRICS_TOKEN', 'scrape-me')
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert b'portal_http_requests_total' in response.data
@@ -0,0 +1,85 @@
+from backend.app import (
+    db, Group, SubSubgroup, LabSlot, Attendance, AttendanceSummary, create_tables_and_seed_data
+)
+
+SLOT_ID = '7a0c2a8e-0d5c-4f4e-9a51-4c1b2e6f0a01'
+SUB_SUBGROUP_ID = '7a0c2a8e-0d5c-4f4e-9a51-4c1b2e6f0a02'
+
+
+def create_legacy_attendance(rows):
+    # The attendance table as databases written before the compact layout (and before the
+    # unique index on roll_no, lab_slot_id, date) have it
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    db.session.add_all([
+        SubSubgroup(id=SUB_SUBGROUP_ID, name='2C22-A', group_id=group.id),
+        LabSlot(id=SLOT_ID, course='UCS', lab='L1', day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+    ])
+    db.session.commit()
+    db.session.execute(db.text("DROP TABLE attendance"))
+    db.session.execute(db.text(
+        "CREATE TABLE attendance (id VARCHAR(36) PRIMARY KEY, roll_no VARCHAR(20) NOT NULL, "
+        "lab_slot_id VARCHAR(36) NOT NULL, sub_subgroup_id VARCHAR(36) NOT NULL, date VARCHAR(10) NOT NULL, "
+        "status VARCHAR(10) NOT NULL, marked_by VARCHAR(50), marked_at VARCHAR(30))"
+    ))
+    db.session.execute(db.text(
+        "INSERT INTO attendance VALUES (:id, :roll_no, :slot, :ssg, :date, :status, 'admin', :marked_at)"
+    ), [{'slot': SLOT_ID, 'ssg': SUB_SUBGROUP_ID, **row} for row in rows])
+    db.session.commit()
+
+
+def compact(app):
+    result = app.test_cli_runner().invoke(args=['compact-attendance'])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_compact_migration_keeps_latest_of_duplicate_marks(app):
+    create_legacy_attendance([
+        {'id': 'u1', 'roll_no': '102', 'date': '2024-01-01', 'status': 'Absent', 'marked_at': '2024-01-01T09:00:00'},
+        {'id': 'u2', 'roll_no': '102', 'date': '2024-01-01', 'status': 'Present', 'marked_at': '2024-01-01T10:00:00'},
+        {'id': 'u3', 'roll_no': '102', 'date': '2024-01-01', 'status': 'Absent', 'marked_at': '2024-01-01T08:00:00'},
+        {'id': 'u4', 'roll_no': '103', 'date': '2024-01-01', 'status': 'Absent', 'marked_at': '2024-01-01T09:00:00'},
+        {'id': 'u5', 'roll_no': '102', 'date': '2024-01-08', 'status': 'Present', 'marked_at': None},
+    ])
+
+    compact(app)
+
+    marks = {(row.roll_no, row.date): row.status for row in Attendance.query.all()}
+    assert marks == {
+        ('102', '2024-01-01'): 'Present',
+        ('103', '2024-01-01'): 'Absent',
+        ('102', '2024-01-08'): 'Present',
+    }
+    summary = AttendanceSummary.query.filter_by(roll_no='102').one()
+    assert (summary.sessions, summary.present) == (2, 2)
+    indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('attendance')}
+    assert 'uq_attendance_roll_slot_date' in indexes
+
+
+def test_compaction_keeps_uuid_ids_and_keys_references(app):
+    legacy_id = '0b9e3c54-5f0e-4d0c-8a3e-2f6d9b1c7e11'
+    create_legacy_attendance([
+        {'id': legacy_id, 'roll_no': '102', 'date': '2024-01-01', 'status': 'Present', 'marked_at': None},
+    ])
+
+    compact(app)
+
+    mark = Attendance.query.one()
+    slot = LabSlot.query.get(SLOT_ID)
+    assert mark.public_id == legacy_id
+    assert (mark.lab_slot_key, mark.sub_subgroup_key) == (slot.key, SubSubgroup.query.get(SUB_SUBGROUP_ID).key)
+    assert mark.to_dict()['slotId'] == SLOT_ID
+    assert 'Attendance table already uses the compact layout.' in compact(app)
+
+
+def test_startup_leaves_legacy_attendance_for_the_command(app):
+    create_legacy_attendance([
+        {'id': 'u1', 'roll_no': '102', 'date': '2024-01-01', 'status': 'Present', 'marked_at': None},
+    ])
+
+    create_tables_and_seed_data()
+
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('attendance')}
+    assert 'lab_slot_id' in columns and 'lab_slot_key' not in columns
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from backend import app as portal
+from backend.app import MemoryTokenBuckets, SQLiteTokenBuckets, single_flight
+
+
+@pytest.fixture
+def limited(client, monkeypatch):
+    # Bursts of two, then one request every two seconds
+    monkeypatch.setitem(client.application.config, 'PUBLIC_RATE_LIMIT_PER_SECOND', 0.5)
+    monkeypatch.setitem(client.application.config, 'PUBLIC_RATE_LIMIT_BURST', 2)
+    monkeypatch.setattr(portal, 'rate_buckets', MemoryTokenBuckets())
+    return client
+
+
+def get_schedule(client, ip):
+    return client.get('/api/public_schedule', environ_base={'REMOTE_ADDR': ip})
+
+
+def test_public_requests_beyond_the_burst_get_429_with_retry_after(limited):
+    assert [get_schedule(limited, '10.0.0.1').status_code for _ in range(2)] == [200, 200]
+
+    refused = get_schedule(limited, '10.0.0.1')
+    assert refused.status_code == 429
+    assert refused.headers['Retry-After'] == '2'
+    # Other clients have buckets of their own
+    assert get_schedule(limited, '10.0.0.2').status_code == 200
+
+
+def test_sqlite_buckets_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    first_worker, second_worker = SQLiteTokenBuckets(path), SQLiteTokenBuckets(path)
+
+    assert first_worker.take('public:10.0.0.1', 0.5, 2) == 0
+    assert second_worker.take('public:10.0.0.1', 0.5, 2) == 0
+    assert first_worker.take('public:10.0.0.1', 0.5, 2) > 1
+    assert second_worker.take('public:10.0.0.2', 0.5, 2) == 0
+
+
+def run_flight(monkeypatch, outcome, followers=3):
+    # One leader computes while `followers` callers with the same key wait on it; returns
+    # the number of computations and what each caller got back or raised
+    waiting = threading.Semaphore(0)
+
+    class CountingEvent(threading.Event):
+        def wait(self, timeout=None):
+            waiting.release()
+            return super().wait(timeout)
+
+    class CountingFlight(portal._Flight):
+        def __init__(self):
+            super().__init__()
+            self.done = CountingEvent()
+
+    monkeypatch.setattr(portal, '_Flight', CountingFlight)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return outcome()
+
+    def call():
+        try:
+            results.append(single_flight('lookup', compute))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=call) for _ in range(followers)]
+    for thread in threads[1:]:
+        thread.start()
+    for _ in range(followers):
+        assert waiting.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return len(calls), results
+
+
+def test_single_flight_shares_one_computation(monkeypatch):
+    calls, results = run_flight(monkeypatch, lambda: {'rollNo': '102'})
+
+    assert calls == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    assert portal._inflight == {}
+
+
+def test_single_flight_hands_the_error_to_every_caller(monkeypatch):
+    def fail():
+        raise ValueError('lookup failed')
+
+    calls, results = run_flight(monkeypatch, fail)
+
+    assert calls == 1
+    assert len(results) == 4 and all(isinstance(result, ValueError) for result in results)
+    # The failed flight is not remembered
+    assert single_flight('lookup', lambda: 'recovered') == 'recovered'
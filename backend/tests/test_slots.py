@@ -0,0 +1,62 @@
+import json
+import re
+
+from backend.app import db, Group, SubSubgroup, LabSlot, SlotSubSubgroup, bump_reference_version
+
+
+def add_slots(start, count):
+    for i in range(start, start + count):
+        group = Group(name=f"G{i}")
+        db.session.add(group)
+        db.session.flush()
+        sub_subgroups = [SubSubgroup(name=f"G{i}-{suffix}", group_id=group.id) for suffix in 'AB']
+        db.session.add_all(sub_subgroups)
+        slot = LabSlot(course='UCS', lab=f"L{i}", day='Monday', time='8:00 AM - 8:50 AM',
+                       group_name=json.dumps([group.name]))
+        db.session.add(slot)
+        db.session.flush()
+        db.session.add_all(SlotSubSubgroup(lab_slot_id=slot.id, sub_subgroup_id=ssg.id) for ssg in sub_subgroups)
+    db.session.commit()
+
+
+def cold_query_count(client, url):
+    # Invalidate the reference cache so the request reloads slots from the database
+    bump_reference_version()
+    db.session.commit()
+    response = client.get(url)
+    assert response.status_code == 200
+    count = int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+    return count, response.get_json()
+
+
+def test_slot_endpoints_query_count_does_not_grow_with_slots(client):
+    add_slots(0, 5)
+    counts = {}
+    for url in ('/api/slots', '/api/public_schedule'):
+        count, slots = cold_query_count(client, url)
+        assert len(slots) == 5
+        counts[url] = count
+
+    add_slots(5, 45)
+    for url in ('/api/slots', '/api/public_schedule'):
+        count, slots = cold_query_count(client, url)
+        assert len(slots) == 50
+        assert all(len(slot['subSubgroups']) == 2 for slot in slots)
+        assert count == counts[url]
+
+
+def test_reference_cache_rechecks_after_the_bump_commits(client, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'REFERENCE_CACHE_CHECK_INTERVAL', 60)
+    add_slots(0, 1)
+    bump_reference_version()
+    db.session.commit()
+    assert len(client.get('/api/slots').get_json()) == 1
+
+    add_slots(1, 1)
+    bump_reference_version()
+    db.session.flush()
+    # A read before the commit still sees the old version...
+    assert len(client.get('/api/slots').get_json()) == 1
+    db.session.commit()
+    # ...and must not stop this worker noticing the new one
+    assert len(client.get('/api/slots').get_json()) == 2
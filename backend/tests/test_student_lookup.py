@@ -0,0 +1,83 @@
+import re
+
+from backend.app import db, Group, SubSubgroup, LabSlot, SlotSubSubgroup, Student, upsert_attendance_rows
+
+
+def seed_history(dates_by_course):
+    # One slot per course, all assigned to 102's sub-subgroup, with a mark on each date
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    sub_subgroup = SubSubgroup(name='2C22-A', group_id=group.id)
+    db.session.add(sub_subgroup)
+    db.session.flush()
+    db.session.add(Student(roll_no='102', name='Al', sub_subgroup_id=sub_subgroup.id))
+    rows = []
+    for i, (course, dates) in enumerate(sorted(dates_by_course.items())):
+        slot = LabSlot(course=course, lab=f"L{i}", day='Monday', time='8:00 AM - 8:50 AM', group_name='["2C22"]')
+        db.session.add(slot)
+        db.session.flush()
+        db.session.add(SlotSubSubgroup(lab_slot_id=slot.id, sub_subgroup_id=sub_subgroup.id))
+        rows.extend({
+            'roll_no': '102', 'lab_slot_key': slot.key, 'sub_subgroup_key': sub_subgroup.key,
+            'date': date_str, 'status': status, 'marked_by': 'admin', 'marked_at': f"{date_str}T10:00:00"
+        } for date_str, status in dates)
+    upsert_attendance_rows(rows)
+    db.session.commit()
+    return rows
+
+
+def lookup(client, url):
+    response = client.get(url, headers={'Authorization': ''})
+    queries = int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+    return response, queries
+
+
+def test_lookup_pages_by_date_and_totals_the_whole_history(client):
+    seed_history({
+        'UCS101': [('2024-01-01', 'Present'), ('2024-01-08', 'Absent'), ('2024-01-15', 'Present')],
+        'UCS102': [('2024-01-08', 'Present'), ('2024-01-15', 'Present')],
+    })
+
+    # A page of 2 would split 2024-01-08, so it stops after 2024-01-15
+    first = client.get('/api/student_lookup/102?limit=2', headers={'Authorization': ''}).get_json()
+    assert sorted((record['date'], record['course']) for record in first['attendanceRecords']) == [
+        ('2024-01-15', 'UCS101'), ('2024-01-15', 'UCS102')
+    ]
+    assert first['nextBefore'] == '2024-01-15'
+    assert first['attendanceTotals'] == [
+        {'course': 'UCS101', 'present': 2, 'absent': 1, 'total': 3, 'percentage': 66.67},
+        {'course': 'UCS102', 'present': 2, 'absent': 0, 'total': 2, 'percentage': 100.0},
+    ]
+    assert sorted(slot['course'] for slot in first['assignedSlots']) == ['UCS101', 'UCS102']
+
+    second = client.get('/api/student_lookup/102?limit=2&before=2024-01-15', headers={'Authorization': ''}).get_json()
+    assert [record['date'] for record in second['attendanceRecords']] == ['2024-01-08', '2024-01-08']
+    third = client.get(f"/api/student_lookup/102?limit=2&before={second['nextBefore']}",
+                       headers={'Authorization': ''}).get_json()
+    assert [record['date'] for record in third['attendanceRecords']] == ['2024-01-01']
+    assert third['nextBefore'] is None
+
+
+def test_lookup_query_count_does_not_grow_with_history(client):
+    rows = seed_history({'UCS101': [('2024-01-01', 'Present')], 'UCS102': [('2024-01-01', 'Absent')]})
+    lookup(client, '/api/student_lookup/102')  # loads the worker's caches
+    _, few = lookup(client, '/api/student_lookup/102')
+
+    upsert_attendance_rows([
+        dict(row, date=f"2024-{month:02d}-{day:02d}", marked_at=f"2024-{month:02d}-{day:02d}T10:00:00")
+        for row in rows for month in range(2, 7) for day in (1, 8, 15, 22)
+    ])
+    db.session.commit()
+    response, many = lookup(client, '/api/student_lookup/102?limit=100')
+
+    assert len(response.get_json()['attendanceRecords']) == 42
+    assert many == few
+
+
+def test_lookup_errors(client):
+    response = client.get('/api/student_lookup/999', headers={'Authorization': ''})
+    assert response.status_code == 404
+    assert response.get_json()['archivedTerms'] == []
+    assert client.get('/api/student_lookup/999?before=yesterday', headers={'Authorization': ''}).status_code == 400
+    assert client.get('/api/student_lookup/999?term=no-such-term', headers={'Authorization': ''}).status_code == 404
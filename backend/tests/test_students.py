@@ -0,0 +1,97 @@
+import io
+
+from backend.app import db, Group, SubSubgroup, Student
+
+
+def add_students(*students):
+    group = Group(name='2C22')
+    db.session.add(group)
+    db.session.flush()
+    sub_subgroup = SubSubgroup(name='2C22-A', group_id=group.id)
+    db.session.add(sub_subgroup)
+    db.session.flush()
+    db.session.add_all(Student(roll_no=roll_no, name=name, sub_subgroup_id=sub_subgroup.id) for roll_no, name in students)
+    db.session.commit()
+
+
+def test_public_suggestions_are_roll_number_prefixes_without_names(client):
+    add_students(('102303001', 'Zoravar Singh'), ('102303002', 'Amrit Kaur'), ('102404001', 'Zoravar Gill'))
+    response = client.get('/api/students/suggest?prefix=1023', headers={'Authorization': ''})
+    assert response.status_code == 200
+    assert response.get_json() == [{'rollNo': '102303001'}, {'rollNo': '102303002'}]
+
+    assert client.get('/api/students/suggest?prefix=zoravar', headers={'Authorization': ''}).get_json() == []
+    assert client.get('/api/students/suggest?prefix=10', headers={'Authorization': ''}).status_code == 400
+
+
+def test_name_search_requires_admin(client):
+    add_students(('102303001', 'Zoravar Singh'))
+    assert client.get('/api/students/search?q=zorav', headers={'Authorization': ''}).status_code == 401
+    response = client.get('/api/students/search?q=zorav')
+    assert response.status_code == 200
+    assert [match['name'] for match in response.get_json()] == ['Zoravar Singh']
+
+
+def upload(client, text, filename='students.csv'):
+    return client.post('/api/students/upload', data={'file': (io.BytesIO(text.encode('utf-8')), filename)})
+
+
+def test_upload_rejects_files_it_cannot_read(client):
+    assert upload(client, 'Roll No,Name\n102,Al\n').status_code == 400
+    assert upload(client, 'Roll No,Name,Sub-subgroup\n102,Al,2C22-A\n', filename='students.txt').status_code == 400
+    assert Student.query.count() == 0
+
+
+def test_upload_skips_bad_and_duplicate_rows(client, monkeypatch):
+    add_students(('102', 'Al'))
+    # Several insert batches in one upload
+    monkeypatch.setitem(client.application.config, 'STUDENT_IMPORT_BATCH_SIZE', 2)
+    response = upload(client, '\ufeffRoll No,Name,Sub-subgroup\n'
+                              '102,Dup Of Existing,2C22-A\n'
+                              '103,Bo,2c22-a\n'
+                              '104,Cy,2C22-A\n'
+                              '103,Dup In File,2C22-A\n'
+                              '105,,2C22-A\n'
+                              '106,Di,2C22-Z\n'
+                              '107,Ed,2C22-A\n')
+
+    assert response.status_code == 202
+    message = response.get_json()['message']
+    assert message.startswith('3 new students uploaded successfully.')
+    for warning in ('duplicate student: 102', 'duplicate student: 103', 'row 6 due to missing data',
+                    'Invalid sub-subgroup: 2C22-Z'):
+        assert warning in message
+    assert {student.roll_no: student.name for student in Student.query.all()} == {
+        '102': 'Al', '103': 'Bo', '104': 'Cy', '107': 'Ed'
+    }
+    # New students are searchable straight away
+    assert [match['rollNo'] for match in client.get('/api/students/search?q=107').get_json()] == ['107']
+
+
+def test_roster_pages_by_roll_number_with_filters_and_fields(client):
+    add_students(('101', 'Amrit Kaur'), ('102', 'Bhavna'), ('103', 'amrit Sen'), ('104', 'Chetan'), ('105', 'Dev'))
+    other_group = Group(name='2C23')
+    db.session.add(other_group)
+    db.session.flush()
+    other = SubSubgroup(name='2C23-A', group_id=other_group.id)
+    db.session.add(other)
+    db.session.flush()
+    db.session.add(Student(roll_no='201', name='Amrit Gill', sub_subgroup_id=other.id))
+    db.session.commit()
+
+    first = client.get('/api/students?limit=2')
+    assert [student['rollNo'] for student in first.get_json()] == ['101', '102']
+    assert first.headers['X-Total-Count'] == '6'
+    second = client.get(f"/api/students?limit=2&after={first.headers['X-Next-Cursor']}")
+    assert [student['rollNo'] for student in second.get_json()] == ['103', '104']
+    last = client.get('/api/students?limit=2&after=104')
+    assert [student['rollNo'] for student in last.get_json()] == ['105', '201']
+    assert 'X-Next-Cursor' not in last.headers
+
+    by_group = client.get('/api/students?group=2C22&q=amrit&fields=rollNo,subSubgroup')
+    # Names match as typed and with a leading capital
+    assert by_group.get_json() == [{'rollNo': '101', 'subSubgroup': '2C22-A'}, {'rollNo': '103', 'subSubgroup': '2C22-A'}]
+    assert by_group.headers['X-Total-Count'] == '2'
+    by_roll = client.get('/api/students?q=20&subSubgroup=2C23-A&fields=name')
+    assert by_roll.get_json() == [{'name': 'Amrit Gill'}]
+    assert client.get('/api/students?fields=rollNo,password').status_code == 400
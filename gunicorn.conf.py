@@ -0,0 +1,29 @@
+# gunicorn settings, read by the Procfile's `gunicorn --config gunicorn.conf.py`.
+# gevent workers run each request and each open /api/events stream as a greenlet, so one
+# worker serves hundreds of idle streams alongside ordinary requests.
+import os
+
+worker_class = 'gevent'
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+def post_fork(server, worker):
+    # psycopg2 blocks in C while waiting on the server, which would stall every greenlet in
+    # the worker; this makes it wait through gevent instead
+    if not os.getenv('DATABASE_URL', '').startswith(('postgres://', 'postgresql://')):
+        return
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    def wait_callback(connection, timeout=None):
+        while True:
+            state = connection.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                wait_read(connection.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(connection.fileno(), timeout=timeout)
+            else:
+                raise OperationalError(f"Bad result from poll: {state!r}")
+
+    extensions.set_wait_callback(wait_callback)
@@ -15,15 +15,94 @@ document.addEventListener("DOMContentLoaded", () => {
     }, {});
   }
 
-  if (localStorage.getItem("isAdminLoggedIn") !== "true") {
+  if (
+    localStorage.getItem("isAdminLoggedIn") !== "true" ||
+    !localStorage.getItem("adminToken")
+  ) {
     window.location.href = "login.html";
   }
 
-  document.getElementById("logoutBtn").addEventListener("click", () => {
+  function clearLoginAndRedirect() {
     localStorage.removeItem("isAdminLoggedIn");
+    localStorage.removeItem("adminToken");
     window.location.href = "login.html";
+  }
+
+  // fetch() for admin-only routes: sends the login token and returns to the login
+  // page when the server rejects it (expired, or revoked by a logout elsewhere)
+  async function authFetch(url, options = {}) {
+    const headers = {
+      ...(options.headers || {}),
+      Authorization: `Bearer ${localStorage.getItem("adminToken")}`,
+    };
+    const response = await fetch(url, { ...options, headers });
+    if (response.status === 401) {
+      clearLoginAndRedirect();
+    }
+    return response;
+  }
+
+  document.getElementById("logoutBtn").addEventListener("click", async () => {
+    try {
+      await authFetch(`${API_BASE_URL}/admin/logout`, { method: "POST" });
+    } catch (error) {
+      console.error("Logout request failed:", error);
+    }
+    clearLoginAndRedirect();
   });
 
+  // Slot/group changes (from this or any other admin session) arrive over
+  // /api/events; only the section currently on screen is refetched.
+  const refreshTimers = {};
+  function scheduleRefresh(name, fn) {
+    clearTimeout(refreshTimers[name]);
+    refreshTimers[name] = setTimeout(fn, 200);
+  }
+
+  function isSectionVisible(sectionId) {
+    return !document.getElementById(sectionId).classList.contains("hidden");
+  }
+
+  function applyChange(topic) {
+    if (topic === "group") {
+      SSG_NAME_TO_ID = null;
+      if (isSectionVisible("groupManagementSection")) {
+        scheduleRefresh("groups", renderGroups);
+      }
+      if (isSectionVisible("slotManagementSection")) {
+        scheduleRefresh("slotGroups", populateSlotGroupSelect);
+      }
+    }
+    if (isSectionVisible("slotManagementSection")) {
+      scheduleRefresh("slots", renderSlots);
+    }
+    // Don't pull the slot list out from under an attendance sheet in progress
+    if (
+      isSectionVisible("attendanceMarkingSection") &&
+      !document.getElementById("attendanceSlot").value
+    ) {
+      scheduleRefresh("attendanceSlots", populateAttendanceSlots);
+      scheduleRefresh("exportSlots", () =>
+        buildSubSubgroupMap().then(populateExportAttendanceSlots)
+      );
+    }
+  }
+
+  let changeEvents = null;
+  if (window.EventSource) {
+    changeEvents = new EventSource(`${API_BASE_URL}/events?topics=slot,group`);
+    changeEvents.addEventListener("slot", () => applyChange("slot"));
+    changeEvents.addEventListener("group", () => applyChange("group"));
+    changeEvents.addEventListener("reset", () => applyChange("group"));
+  }
+
+  // After our own write the change event does the refresh, unless the stream is down
+  function refreshAfterChange(topic) {
+    if (!changeEvents || changeEvents.readyState !== EventSource.OPEN) {
+      applyChange(topic);
+    }
+  }
+
   window.showSection = function (sectionId) {
     document.querySelectorAll(".admin-section").forEach((section) => {
       section.classList.add("hidden");
@@ -50,6 +129,7 @@ document.addEventListener("DOMContentLoaded", () => {
         .then(() => {
           populateExportAttendanceSlots();
         })
+        .then(populateExportAttendanceTerms)
         .catch((err) => {
           console.error("Failed to load sub-subgroup map:", err);
           alert(
@@ -71,6 +151,7 @@ document.addEventListener("DOMContentLoaded", () => {
       document.getElementById("exportAttendanceSubSubgroup").disabled = true;
       document.getElementById("exportStartDate").value = "";
       document.getElementById("exportEndDate").value = "";
+      document.getElementById("exportAttendanceTerm").value = "";
       document.getElementById("exportAttendanceStatus").classList.add("hidden");
       document.getElementById("exportAttendanceError").classList.add("hidden");
     }
@@ -161,7 +242,7 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
   async function downloadAttendanceExport(url) {
-    const res = await fetch(url, { method: "GET", headers: { Accept: "*/*" } });
+    const res = await authFetch(url, { method: "GET", headers: { Accept: "*/*" } });
     if (!res.ok) {
       const txt = await res.text();
       throw new Error(
@@ -194,6 +275,39 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // Queues the export on the server and polls until the file is ready to download
+  async function runAttendanceExportJob(filters) {
+    const res = await authFetch(`${API_BASE_URL}/attendance/export`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(filters),
+    });
+    let job = await res.json();
+    if (!res.ok) {
+      throw new Error(`Export failed: ${res.status} - ${job.message}`);
+    }
+
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const statusRes = await authFetch(job.statusUrl);
+      job = await statusRes.json();
+      if (!statusRes.ok) {
+        throw new Error(`Export failed: ${statusRes.status} - ${job.message}`);
+      }
+      if (job.progress !== null && job.progress !== undefined) {
+        exportAttendanceStatus.textContent = `Exporting... ${Math.round(
+          job.progress * 100
+        )}%`;
+        exportAttendanceStatus.classList.remove("hidden");
+      }
+    }
+
+    if (job.status !== "done") {
+      throw new Error(`Export failed: ${job.error}`);
+    }
+    await downloadAttendanceExport(job.downloadUrl);
+  }
+
   async function populateSlotGroupSelect() {
     try {
       const response = await fetch(`${API_BASE_URL}/groups`);
@@ -380,13 +494,13 @@ document.addEventListener("DOMContentLoaded", () => {
     try {
       let response;
       if (id) {
-        response = await fetch(`${API_BASE_URL}/slots/${id}`, {
+        response = await authFetch(`${API_BASE_URL}/slots/${id}`, {
           method: "PUT",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify(slotData),
         });
       } else {
-        response = await fetch(`${API_BASE_URL}/slots`, {
+        response = await authFetch(`${API_BASE_URL}/slots`, {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify(slotData),
@@ -401,10 +515,8 @@ document.addEventListener("DOMContentLoaded", () => {
       }
 
       await response.json();
-      renderSlots();
       clearSlotForm();
-      populateAttendanceSlots();
-      populateExportAttendanceSlots();
+      refreshAfterChange("slot");
     } catch (error) {
       console.error("Error saving slot:", error);
       alert(`Failed to save slot: ${error.message}`);
@@ -464,7 +576,7 @@ document.addEventListener("DOMContentLoaded", () => {
   window.deleteSlot = async function (id) {
     if (confirm("Are you sure you want to delete this slot?")) {
       try {
-        const response = await fetch(`${API_BASE_URL}/slots/${id}`, {
+        const response = await authFetch(`${API_BASE_URL}/slots/${id}`, {
           method: "DELETE",
         });
 
@@ -475,10 +587,8 @@ document.addEventListener("DOMContentLoaded", () => {
           );
         }
 
-        renderSlots();
         clearSlotForm();
-        populateAttendanceSlots();
-        populateExportAttendanceSlots();
+        refreshAfterChange("slot");
       } catch (error) {
         console.error("Error deleting slot:", error);
         alert(`Failed to delete slot: ${error.message}`);
@@ -558,13 +668,13 @@ document.addEventListener("DOMContentLoaded", () => {
     try {
       let response;
       if (id) {
-        response = await fetch(`${API_BASE_URL}/groups/${id}`, {
+        response = await authFetch(`${API_BASE_URL}/groups/${id}`, {
           method: "PUT",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify({ name }),
         });
       } else {
-        response = await fetch(`${API_BASE_URL}/groups`, {
+        response = await authFetch(`${API_BASE_URL}/groups`, {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify({ name }),
@@ -579,11 +689,8 @@ document.addEventListener("DOMContentLoaded", () => {
       }
 
       await response.json();
-      renderGroups();
       clearGroupForm();
-      populateSlotGroupSelect();
-      populateAttendanceSlots();
-      populateExportAttendanceSlots();
+      refreshAfterChange("group");
     } catch (error) {
       console.error("Error saving group:", error);
       alert(`Failed to save group: ${error.message}`);
@@ -620,7 +727,7 @@ document.addEventListener("DOMContentLoaded", () => {
       )
     ) {
       try {
-        const response = await fetch(`${API_BASE_URL}/groups/${id}`, {
+        const response = await authFetch(`${API_BASE_URL}/groups/${id}`, {
           method: "DELETE",
         });
 
@@ -631,11 +738,8 @@ document.addEventListener("DOMContentLoaded", () => {
           );
         }
 
-        renderGroups();
         clearGroupForm();
-        populateSlotGroupSelect();
-        populateAttendanceSlots();
-        populateExportAttendanceSlots();
+        refreshAfterChange("group");
       } catch (error) {
         console.error("Error deleting group:", error);
         alert(`Failed to delete group: ${error.message}`);
@@ -649,16 +753,36 @@ document.addEventListener("DOMContentLoaded", () => {
   const uploadStatus = document.getElementById("uploadStatus");
   const uploadError = document.getElementById("uploadError");
 
-  async function renderStudents() {
+  // The roster is fetched a page at a time; "Load more" follows the server's cursor
+  let studentsNextCursor = null;
+  let studentSearchTimer = null;
+
+  async function renderStudents(append = false) {
     try {
-      const response = await fetch(`${API_BASE_URL}/students`);
+      const params = new URLSearchParams({
+        limit: "100",
+        fields: "rollNo,name,subSubgroup",
+      });
+      const search = document.getElementById("studentSearchInput").value.trim();
+      if (search) params.append("q", search);
+      if (append && studentsNextCursor) params.append("after", studentsNextCursor);
+
+      const response = await authFetch(`${API_BASE_URL}/students?${params.toString()}`);
       if (!response.ok)
         throw new Error(`HTTP error! status: ${response.status}`);
       const students = await response.json();
 
-      studentsTableBody.innerHTML = "";
+      studentsNextCursor = response.headers.get("X-Next-Cursor");
+      document
+        .getElementById("loadMoreStudentsBtn")
+        .classList.toggle("hidden", !studentsNextCursor);
+      const total = response.headers.get("X-Total-Count");
+      document.getElementById("studentsCount").textContent =
+        total !== null ? `${total} students` : "";
+
+      if (!append) studentsTableBody.innerHTML = "";
 
-      if (students.length === 0) {
+      if (!append && students.length === 0) {
         studentsTableBody.innerHTML =
           '<tr><td colspan="4" class="text-center py-4 text-gray-500">No students uploaded yet.</td></tr>';
         return;
@@ -684,6 +808,15 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  document
+    .getElementById("loadMoreStudentsBtn")
+    .addEventListener("click", () => renderStudents(true));
+
+  document.getElementById("studentSearchInput").addEventListener("input", () => {
+    clearTimeout(studentSearchTimer);
+    studentSearchTimer = setTimeout(() => renderStudents(), 300);
+  });
+
   uploadStudentsBtn.addEventListener("click", async () => {
     const file = studentCsvUpload.files[0];
     uploadStatus.classList.add("hidden");
@@ -699,7 +832,7 @@ document.addEventListener("DOMContentLoaded", () => {
     formData.append("file", file);
 
     try {
-      const response = await fetch(`${API_BASE_URL}/students/upload`, {
+      const response = await authFetch(`${API_BASE_URL}/students/upload`, {
         method: "POST",
         body: formData,
       });
@@ -734,7 +867,7 @@ document.addEventListener("DOMContentLoaded", () => {
       )
     ) {
       try {
-        const response = await fetch(`${API_BASE_URL}/students/${rollNo}`, {
+        const response = await authFetch(`${API_BASE_URL}/students/${rollNo}`, {
           method: "DELETE",
         });
 
@@ -763,6 +896,16 @@ document.addEventListener("DOMContentLoaded", () => {
   const markAllAbsentBtn = document.getElementById("markAllAbsentBtn");
 
   let currentStudentsForAttendance = [];
+  // Slot, sub-subgroup rosters and today's marks for the selected slot, in one request
+  let currentAttendanceSession = null;
+
+  async function loadAttendanceSession(slotId) {
+    const response = await authFetch(
+      `${API_BASE_URL}/attendance/session?slotId=${encodeURIComponent(slotId)}`
+    );
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    currentAttendanceSession = await response.json();
+  }
 
   async function populateAttendanceSlots() {
     try {
@@ -799,10 +942,9 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   });
 
-  attendanceSlotSelect.addEventListener("change", () => {
-    const selectedOption =
-      attendanceSlotSelect.options[attendanceSlotSelect.selectedIndex];
+  attendanceSlotSelect.addEventListener("change", async () => {
     const selectedSlotId = attendanceSlotSelect.value;
+    currentAttendanceSession = null;
     attendanceSubSubgroupSelect.innerHTML =
       '<option value="">Select a Sub-subgroup</option>';
     attendanceSubSubgroupSelect.disabled = true;
@@ -810,43 +952,48 @@ document.addEventListener("DOMContentLoaded", () => {
       '<tr><td colspan="3" class="text-center py-4 text-gray-500">Select a slot and sub-subgroup to load students.</td></tr>';
     saveAttendanceBtn.disabled = true;
 
-    if (
-      selectedSlotId &&
-      selectedOption &&
-      selectedOption.dataset.subSubgroups
-    ) {
-      const subSubgroups = JSON.parse(selectedOption.dataset.subSubgroups);
-      if (subSubgroups.length > 0) {
-        const sorted = [...subSubgroups].sort();
-        sorted.forEach((subSubgroup) => {
-          const option = document.createElement("option");
-          option.value = subSubgroup;
-          option.textContent = subSubgroup;
-          attendanceSubSubgroupSelect.appendChild(option);
-        });
-        attendanceSubSubgroupSelect.disabled = false;
-      }
+    if (!selectedSlotId) {
+      return;
+    }
+
+    try {
+      await loadAttendanceSession(selectedSlotId);
+    } catch (error) {
+      console.error("Error loading attendance session:", error);
+      attendanceTableBody.innerHTML = `<tr><td colspan="3" class="text-center py-4 text-red-500">Failed to load students for attendance.</td></tr>`;
+      return;
     }
+    // Ignore a response for a slot that is no longer selected
+    if (attendanceSlotSelect.value !== selectedSlotId) {
+      return;
+    }
+
+    currentAttendanceSession.subSubgroups.forEach((subSubgroup) => {
+      const option = document.createElement("option");
+      option.value = subSubgroup.name;
+      option.textContent = subSubgroup.name;
+      attendanceSubSubgroupSelect.appendChild(option);
+    });
+    attendanceSubSubgroupSelect.disabled =
+      currentAttendanceSession.subSubgroups.length === 0;
   });
 
-  attendanceSubSubgroupSelect.addEventListener("change", async () => {
+  attendanceSubSubgroupSelect.addEventListener("change", () => {
     const selectedSlotId = attendanceSlotSelect.value;
     const selectedSubSubgroup = attendanceSubSubgroupSelect.value;
     attendanceTableBody.innerHTML = "";
     currentStudentsForAttendance = [];
     saveAttendanceBtn.disabled = true;
 
-    if (!selectedSlotId || !selectedSubSubgroup) {
+    if (!selectedSlotId || !selectedSubSubgroup || !currentAttendanceSession) {
       return;
     }
 
     try {
-      const response = await fetch(
-        `${API_BASE_URL}/attendance/students?slotId=${selectedSlotId}&subSubgroup=${selectedSubSubgroup}`
+      const subSubgroup = currentAttendanceSession.subSubgroups.find(
+        (ssg) => ssg.name === selectedSubSubgroup
       );
-      if (!response.ok)
-        throw new Error(`HTTP error! status: ${response.status}`);
-      const studentsWithAttendance = await response.json();
+      const studentsWithAttendance = subSubgroup ? subSubgroup.students : [];
 
       if (studentsWithAttendance.length === 0) {
         attendanceTableBody.innerHTML = `<tr><td colspan="3" class="text-center py-4 text-gray-500">No students found for sub-subgroup: ${selectedSubSubgroup}.</td></tr>`;
@@ -858,7 +1005,7 @@ document.addEventListener("DOMContentLoaded", () => {
         row.classList.add("hover:bg-light-blue-100");
         row.dataset.rollNo = student.rollNo;
 
-        const initialStatus = student.initialStatus || "Absent";
+        const initialStatus = student.status || "Absent";
 
         row.innerHTML = `
                     <td class="py-2 px-4 border-b border-gray-200">${
@@ -951,7 +1098,7 @@ document.addEventListener("DOMContentLoaded", () => {
     };
 
     try {
-      const response = await fetch(`${API_BASE_URL}/attendance`, {
+      const response = await authFetch(`${API_BASE_URL}/attendance`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload),
@@ -965,7 +1112,11 @@ document.addEventListener("DOMContentLoaded", () => {
       }
 
       alert("Attendance saved successfully!");
-      attendanceSubSubgroupSelect.dispatchEvent(new Event("change"));
+      loadAttendanceSession(selectedSlotId)
+        .then(() =>
+          attendanceSubSubgroupSelect.dispatchEvent(new Event("change"))
+        )
+        .catch((err) => console.error("Error reloading attendance session:", err));
     } catch (error) {
       console.error("Error saving attendance:", error);
       alert(`Failed to save attendance: ${error.message}`);
@@ -978,6 +1129,9 @@ document.addEventListener("DOMContentLoaded", () => {
   const exportAttendanceSubSubgroupSelect = document.getElementById(
     "exportAttendanceSubSubgroup"
   );
+  const exportAttendanceTermSelect = document.getElementById(
+    "exportAttendanceTerm"
+  );
   const exportStartDateInput = document.getElementById("exportStartDate");
   const exportEndDateInput = document.getElementById("exportEndDate");
   const exportAttendanceBtn = document.getElementById("exportAttendanceBtn");
@@ -990,6 +1144,33 @@ document.addEventListener("DOMContentLoaded", () => {
 
   let allSubSubgroups = [];
 
+  // Archived terms can be exported alongside the current one
+  async function populateExportAttendanceTerms() {
+    try {
+      const response = await authFetch(`${API_BASE_URL}/admin/archives`);
+      if (!response.ok)
+        throw new Error(`HTTP error! status: ${response.status}`);
+      const archives = await response.json();
+
+      const selected = exportAttendanceTermSelect.value;
+      exportAttendanceTermSelect.innerHTML =
+        '<option value="">Current term</option>';
+      archives.forEach((archive) => {
+        const option = document.createElement("option");
+        option.value = archive.term;
+        option.textContent = `${archive.term} (${archive.startDate || "-"} to ${archive.endDate || "-"})`;
+        exportAttendanceTermSelect.appendChild(option);
+      });
+      exportAttendanceTermSelect.value = archives.some(
+        (archive) => archive.term === selected
+      )
+        ? selected
+        : "";
+    } catch (error) {
+      console.error("Error fetching archived terms:", error);
+    }
+  }
+
   async function populateExportAttendanceSlots() {
     try {
       const response = await fetch(`${API_BASE_URL}/attendance/slots`);
@@ -1126,21 +1307,21 @@ document.addEventListener("DOMContentLoaded", () => {
     exportAttendanceStatus.classList.add("hidden");
     exportAttendanceError.classList.add("hidden");
 
+    const term = exportAttendanceTermSelect.value;
     const slotId = exportAttendanceSlotSelect.value;
     const subSubgroupId = exportAttendanceSubSubgroupSelect.value;
     const startDate = exportStartDateInput.value;
     const endDate = exportEndDateInput.value;
 
-    const params = new URLSearchParams();
-    if (slotId) params.append("slotId", slotId);
-    if (subSubgroupId) params.append("subSubgroupId", subSubgroupId);
-    if (startDate) params.append("startDate", startDate);
-    if (endDate) params.append("endDate", endDate);
-
-    const url = `${API_BASE_URL}/attendance/export?${params.toString()}`;
+    const filters = {};
+    if (term) filters.term = term;
+    if (slotId) filters.slotId = slotId;
+    if (subSubgroupId) filters.subSubgroupId = subSubgroupId;
+    if (startDate) filters.startDate = startDate;
+    if (endDate) filters.endDate = endDate;
 
     try {
-      await downloadAttendanceExport(url);
+      await runAttendanceExportJob(filters);
 
       exportAttendanceStatus.textContent = `Attendance exported successfully!`;
       exportAttendanceStatus.classList.remove("hidden");
@@ -1148,7 +1329,7 @@ document.addEventListener("DOMContentLoaded", () => {
       console.error("Error exporting attendance:", error);
       const msg = String(error.message || "").toLowerCase();
 
-      if (msg.includes("404") && msg.includes("no attendance")) {
+      if (msg.includes("no attendance")) {
         exportAttendanceError.textContent =
           "No attendance records found for this selection.";
       } else {
@@ -1159,6 +1340,47 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   });
 
+  document
+    .getElementById("archiveTermBtn")
+    ?.addEventListener("click", async () => {
+      const term = (
+        prompt("Name for the archived term (e.g. 2024-odd):") || ""
+      ).trim();
+      if (!term) return;
+      const endDate = (
+        prompt(
+          "Archive attendance up to this date (YYYY-MM-DD), or leave empty for all:"
+        ) || ""
+      ).trim();
+      if (
+        !confirm(
+          `Move ${endDate ? `attendance up to ${endDate}` : "ALL attendance"} into the "${term}" archive and remove students without newer records?`
+        )
+      ) {
+        return;
+      }
+
+      try {
+        const res = await authFetch(`${API_BASE_URL}/admin/archives`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ term, endDate, clearRoster: true }),
+        });
+        const data = await res.json();
+        if (!res.ok) {
+          throw new Error(data.message || "Archive failed");
+        }
+
+        alert(
+          `Archived ${data.attendanceRows} attendance records to term "${data.term}".`
+        );
+        location.reload();
+      } catch (error) {
+        console.error("Archive failed:", error);
+        alert("Failed to archive term: " + error.message);
+      }
+    });
+
   document
     .getElementById("resetDataBtn")
     ?.addEventListener("click", async () => {
@@ -1171,7 +1393,7 @@ document.addEventListener("DOMContentLoaded", () => {
       }
 
       try {
-        const res = await fetch(`${API_BASE_URL}/admin/reset`, {
+        const res = await authFetch(`${API_BASE_URL}/admin/reset`, {
           method: "POST",
           headers: { "Content-Type": "application/json" },
         });
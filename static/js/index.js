@@ -1,18 +1,83 @@
+// Slots currently shown; kept up to date from /api/events instead of re-downloading
+let scheduleSlots = [];
+let scheduleEtag = null;
+let schedulePoll = null;
 
 document.addEventListener('DOMContentLoaded', () => {
-    renderPublicSchedule();
-    setInterval(renderPublicSchedule, 30000);
+    loadPublicSchedule();
+    subscribeToScheduleChanges();
 });
 
-async function renderPublicSchedule() {
+async function loadPublicSchedule() {
+    try {
+        const response = await fetch('/api/public_schedule', {
+            cache: 'no-store',
+            headers: scheduleEtag ? { 'If-None-Match': scheduleEtag } : {}
+        });
+        // const response = await fetch('http://127.0.0.1:5000/api/public_schedule');
+        if (response.status === 304) return;
+        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+        scheduleSlots = await response.json();
+        scheduleEtag = response.headers.get('ETag');
+        renderPublicSchedule();
+    } catch (error) {
+        console.error('Error fetching public schedule:', error);
+        // A failed reload keeps showing the last schedule loaded
+        if (scheduleEtag) return;
+        document.getElementById('schedule-table-body').innerHTML = `<tr><td colspan="6" class="text-center py-4 text-red-600">Failed to load schedule. Please try again later.</td></tr>`;
+    }
+}
+
+// Polls with If-None-Match (an unchanged schedule costs a bodiless 304) while no event
+// stream is available
+function pollPublicSchedule() {
+    if (schedulePoll) return;
+    schedulePoll = setInterval(() => {
+        if (!document.hidden) loadPublicSchedule();
+    }, 30000);
+}
+
+function subscribeToScheduleChanges() {
+    if (!window.EventSource) {
+        pollPublicSchedule();
+        return;
+    }
+    const events = new EventSource('/api/events?topics=slot,group');
+    events.addEventListener('slot', (e) => {
+        const { action, data } = JSON.parse(e.data);
+        scheduleSlots = scheduleSlots.filter(slot => slot.id !== data.id);
+        if (action !== 'deleted') scheduleSlots.push(data);
+        // The local copy no longer matches the last ETag
+        scheduleEtag = null;
+        renderPublicSchedule();
+    });
+    // Group edits rename sub-subgroups across many slots; reload rather than patch
+    events.addEventListener('group', loadPublicSchedule);
+    // Sent when the server can't replay what was missed while disconnected
+    events.addEventListener('reset', loadPublicSchedule);
+    events.addEventListener('open', () => {
+        if (schedulePoll) {
+            clearInterval(schedulePoll);
+            schedulePoll = null;
+            loadPublicSchedule();
+        }
+    });
+    events.addEventListener('error', () => {
+        // The browser retries dropped streams itself, but gives up on an error response
+        // such as 503 when the server is at its stream limit
+        if (events.readyState === EventSource.CLOSED) {
+            pollPublicSchedule();
+            setTimeout(subscribeToScheduleChanges, 60000);
+        }
+    });
+}
+
+function renderPublicSchedule() {
     const scheduleBody = document.getElementById('schedule-table-body');
     scheduleBody.innerHTML = ''; 
 
     try {
-        const response = await fetch('/api/public_schedule');
-        // const response = await fetch('http://127.0.0.1:5000/api/public_schedule');
-        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-        const slots = await response.json(); 
+        const slots = scheduleSlots;
 
         const timeSlots = generateTimeSlots(); 
 
@@ -108,7 +173,7 @@ async function renderPublicSchedule() {
         });
 
     } catch (error) {
-        console.error('Error fetching public schedule:', error);
+        console.error('Error rendering public schedule:', error);
         scheduleBody.innerHTML = `<tr><td colspan="6" class="text-center py-4 text-red-600">Failed to load schedule. Please try again later.</td></tr>`;
     }
 }
@@ -14,20 +14,70 @@ document.getElementById('student-lookup-form').onsubmit = function (e) {
     showStudentSlot(rollNo);
 }
 
-async function showStudentSlot(rollNo) {
+// Suggest roll numbers starting with what has been typed
+let suggestionTimer = null;
+document.getElementById('student-roll').addEventListener('input', function () {
+    const prefix = this.value.trim().replace(/[^0-9]/g, '');
+    clearTimeout(suggestionTimer);
+    if (prefix.length < 3) return;
+    suggestionTimer = setTimeout(async () => {
+        try {
+            const response = await fetch(`/api/students/suggest?prefix=${encodeURIComponent(prefix)}`);
+            if (!response.ok) return;
+            const matches = await response.json();
+            const datalist = document.getElementById('student-roll-suggestions');
+            datalist.innerHTML = '';
+            matches.forEach(match => {
+                const option = document.createElement('option');
+                option.value = match.rollNo;
+                datalist.appendChild(option);
+            });
+        } catch (error) {
+            console.error('Error fetching suggestions:', error);
+        }
+    }, 200);
+});
+
+// term: a past term's archive; omitted for the current term
+function studentLookupUrl(rollNo, term, params = {}) {
+    const query = new URLSearchParams(params);
+    if (term) query.set('term', term);
+    const queryString = query.toString();
+    return `/api/student_lookup/${rollNo}${queryString ? `?${queryString}` : ''}`;
+}
+
+// Buttons switching between the current term and archived terms holding this student
+function renderTermLinks(archivedTerms, currentTerm) {
+    const terms = (currentTerm ? [''] : []).concat((archivedTerms || []).filter(term => term !== currentTerm));
+    if (terms.length === 0) return '';
+    return `<div class="mt-2 text-sm text-black">${currentTerm ? 'Other terms' : 'Past terms'}: ` +
+        terms.map(term => `<button type="button" class="term-link text-blue-700 underline mr-2" data-term="${term}">${term || 'Current term'}</button>`).join('') +
+        `</div>`;
+}
+
+function setupTermLinks(rollNo) {
+    document.querySelectorAll('#student-slot-display .term-link').forEach(button => {
+        button.onclick = () => showStudentSlot(rollNo, button.dataset.term || null);
+    });
+}
+
+async function showStudentSlot(rollNo, term = null) {
     const displayDiv = document.getElementById('student-slot-display');
     displayDiv.innerHTML = `<p class="text-gray-600">Fetching student data...</p>`;
 
     try {
-        const response = await fetch(`/api/student_lookup/${rollNo}`);
+        const response = await fetch(studentLookupUrl(rollNo, term));
         if (response.status === 404) {
-            displayDiv.innerHTML = `<p class="text-red-700">Student with Roll No. <b>${rollNo}</b> not found.</p>`;
+            const data = await response.json().catch(() => ({}));
+            displayDiv.innerHTML = `<p class="text-red-700">Student with Roll No. <b>${rollNo}</b> not found${term ? ` in term ${term}` : ''}.</p>` +
+                renderTermLinks(data.archivedTerms, term);
+            setupTermLinks(rollNo);
             return;
         }
         if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
 
         const data = await response.json();
-        const { student, assignedSlots, attendanceRecords } = data;
+        const { student, assignedSlots, attendanceRecords, attendanceTotals, nextBefore, archivedTerms } = data;
 
         // Build slots display
         let slotsHtml = '';
@@ -50,21 +100,27 @@ async function showStudentSlot(rollNo) {
             slotsHtml = '<p class="text-gray-600">No slots assigned.</p>';
         }
 
+        // Build per-course totals display
+        let totalsHtml = '';
+        if (attendanceTotals && attendanceTotals.length > 0) {
+            totalsHtml = attendanceTotals.map(t => `
+                <div class="text-sm text-black">${t.course}: 
+                    <span class="font-semibold">${t.present}/${t.total}</span> present (${t.percentage}%)
+                </div>
+            `).join('');
+        }
+
         // Build attendance display
         let attendanceHtml = '';
         if (attendanceRecords && attendanceRecords.length > 0) {
-            attendanceHtml = attendanceRecords.map(att => {
-                const isPresent = att.status === 'Present';
-                return `<li class="text-black">${att.date} : 
-                    <span class="${isPresent ? 'text-green-700 font-bold' : 'text-red-700 font-bold'}">${isPresent ? '✓ Present' : '✗ Absent'}</span>
-                </li>`;
-            }).join("");
+            attendanceHtml = renderAttendanceItems(attendanceRecords);
         } else {
             attendanceHtml = '<li class="text-gray-600">No attendance records found.</li>';
         }
 
         let html = `
             <div class="bg-blue-100 p-4 rounded shadow">
+                ${term ? `<div class="mb-2 text-black">Term: <span class="font-semibold">${term}</span> (archived)</div>` : ''}
                 <div class="mb-2 text-black">Roll No: <span class="font-semibold">${student.rollNo}</span></div>
                 <div class="mb-2 text-black">Name: <span class="font-semibold">${student.name}</span></div>
                 <div class="mb-2 text-black">Sub-subgroup: <span class="font-semibold">${student.subSubgroup}</span></div>
@@ -72,16 +128,57 @@ async function showStudentSlot(rollNo) {
                 <div class="mt-4 mb-2 text-black font-semibold">Assigned Lab Slots:</div>
                 ${slotsHtml}
                 
+                <div class="mt-4 mb-2 text-black font-semibold">Attendance Summary:</div>
+                ${totalsHtml || '<p class="text-gray-600">No attendance records found.</p>'}
+
                 <div class="mt-4 mb-2 text-black font-semibold">Attendance Records:</div>
-                <ul class="ml-4">
+                <ul class="ml-4" id="attendance-record-list">
                     ${attendanceHtml}
                 </ul>
+                <button id="load-older-attendance" class="mt-2 text-sm text-blue-700 underline hidden">Load older records</button>
+                ${renderTermLinks(archivedTerms, term)}
             </div>`;
 
         displayDiv.innerHTML = html;
+        setupLoadOlder(rollNo, nextBefore, term);
+        setupTermLinks(rollNo);
 
     } catch (error) {
         console.error('Error fetching student data:', error);
         displayDiv.innerHTML = `<p class="text-red-700">Error fetching student data. Please try again later.</p>`;
     }
 }
+
+function renderAttendanceItems(records) {
+    return records.map(att => {
+        const isPresent = att.status === 'Present';
+        return `<li class="text-black">${att.date} : 
+            <span class="${isPresent ? 'text-green-700 font-bold' : 'text-red-700 font-bold'}">${isPresent ? '✓ Present' : '✗ Absent'}</span>
+        </li>`;
+    }).join("");
+}
+
+// Attendance history is paginated by date; fetch the next page on demand
+function setupLoadOlder(rollNo, nextBefore, term) {
+    const button = document.getElementById('load-older-attendance');
+    if (!nextBefore) {
+        button.classList.add('hidden');
+        return;
+    }
+    button.classList.remove('hidden');
+    button.onclick = async () => {
+        button.disabled = true;
+        try {
+            const response = await fetch(studentLookupUrl(rollNo, term, { before: nextBefore }));
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+            const data = await response.json();
+            document.getElementById('attendance-record-list')
+                .insertAdjacentHTML('beforeend', renderAttendanceItems(data.attendanceRecords));
+            setupLoadOlder(rollNo, data.nextBefore, term);
+        } catch (error) {
+            console.error('Error fetching older attendance:', error);
+        } finally {
+            button.disabled = false;
+        }
+    };
+}